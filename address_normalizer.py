@@ -0,0 +1,52 @@
+# Importy wbudowane
+import re
+
+# === KONFIGURACJA ===
+# Warianty przedrostków ulic sprowadzane do jednej, skróconej postaci - tylko na początku członu adresu
+# (przed pierwszym przecinkiem lub po nim) i tylko jako całe słowo, żeby nie zmieniać nazw typu "Placowa" czy "Plac Bema"
+STREET_PREFIXES = [
+    (re.compile(r'^(?:ulica(?=[\s.,]|$)|ul\.|ul(?=\s))\s*', re.IGNORECASE), "ul. "),
+    (re.compile(r'^(?:aleja(?=[\s.,]|$)|aleje(?=[\s.,]|$)|al\.|al(?=\s))\s*', re.IGNORECASE), "al. "),
+    (re.compile(r'^(?:plac(?=[\s.,]|$)|pl\.|pl(?=\s))\s*', re.IGNORECASE), "pl. "),
+    (re.compile(r'^(?:osiedle(?=[\s.,]|$)|os\.|os(?=\s))\s*', re.IGNORECASE), "os. "),
+]
+
+# Polskie znaki diakrytyczne pomijane w kluczu (np. "Lodz" i "Łódź" to ten sam adres)
+DIACRITICS = str.maketrans("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ")
+
+
+# === FUNKCJE ===
+def normalize_address(address):
+    """ Sprowadza polski adres do postaci kanonicznej (spacje, przecinki, kody pocztowe, "ul."/"ulica" itp.). """
+    address = re.sub(r'\s+', ' ', address).strip(" ,;")
+    parts = [part.strip() for part in address.split(",")]
+    for position, part in enumerate(parts):
+        # Jeden przedrostek na człon - "ul Plac Bema" to "ul. Plac Bema", a nie "ul. pl. Bema"
+        for pattern, replacement in STREET_PREFIXES:
+            part, replaced = pattern.subn(replacement, part, count=1)
+            if replaced:
+                break
+        parts[position] = part
+    address = ", ".join(parts)  # Jednolite przecinki
+    address = re.sub(r'\b(\d{2})\s*-\s*(\d{3})\b', r'\1-\2', address)  # Kod pocztowy "00 - 950" -> "00-950"
+    return address.strip()
+
+def address_key(address):
+    """ Zwraca klucz porównawczy adresu (postać kanoniczna bez wielkości liter i polskich znaków). """
+    return normalize_address(address).casefold().translate(DIACRITICS)
+
+def deduplicate_addresses(addresses):
+    """ Zwraca (unikalne adresy do wyszukania, indeks unikalnego adresu dla każdego wiersza wejściowego).
+
+    Postać kanoniczna służy tylko jako klucz porównania - do wyszukania trafia pierwsza pisownia adresu z wejścia.
+    """
+    unique_addresses = []
+    row_to_unique = []
+    positions = {}
+    for address in addresses:
+        key = address_key(address)
+        if key not in positions:
+            positions[key] = len(unique_addresses)
+            unique_addresses.append(re.sub(r'\s+', ' ', address).strip())
+        row_to_unique.append(positions[key])
+    return unique_addresses, row_to_unique
@@ -1,109 +1,152 @@
 # Importy wbudowane
-import re
+import os
 import time
+import hashlib
 from io import BytesIO
-import random
 
 # Importy zewnętrzne
 import streamlit as st
-import pandas as pd
-import pydeck as pdk
-import folium
 from streamlit.components.v1 import html
-# Selenium do automatyzacji przeglądarki
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+
+# Moduły aplikacji (przeglądarka, Folium i pandas są importowane dopiero w miejscu użycia)
+from geocoder import is_valid_address
+from job_service import get_job_service, CANCELLED, JOB_TTL
+from geocode_cache import get_cache
+from map_view import create_folium_map, create_pydeck_map, map_mode
+from spatial_index import get_spatial_index
+from metrics import serve_metrics
+from resilience import get_breaker
+from export import export_bytes, EXPORT_FORMATS
+from file_io import iter_table_rows, iter_column, iter_chunks, read_header, table_kind
+from distances import (assign_to_sites, distance_matrix_file, remove_matrix_file, remove_stale_matrix_files, read_sites,
+                       DISTANCE_COLUMN, MATRIX_MAX_POINTS)
+
+PARSE_CHUNK_SIZE = 5000  # Liczba wierszy pliku przetwarzanych w jednej partii
+RENDER_INTERVAL = 1.0  # Jak często (s) odświeżać tabelę z częściowymi wynikami
+MAP_RENDER_INTERVAL = 5.0  # Jak często (s) odświeżać mapę z częściowymi wynikami
+
+# Współrzędne w tabeli są liczbami - wyświetlane z dokładnością do 8 miejsc po przecinku
+TABLE_COLUMN_CONFIG = {
+    "Latitude": st.column_config.NumberColumn(format="%.8f"),
+    "Longitude": st.column_config.NumberColumn(format="%.8f"),
+    DISTANCE_COLUMN: st.column_config.NumberColumn(format="%.1f"),
+}
 
 # === FUNKCJE ===
-def get_google_maps_link(address):
-    """ Pobiera link do Google Maps na podstawie wpisanego adresu oraz wyciąga poprawny adres wyszukany przez Google Maps. """
-    service = Service(ChromeDriverManager().install())
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")  # Uruchomienie w tle (bez okna)
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(service=service, options=options)
-
-    try:
-        driver.get("https://www.google.com/maps")
-        wait = WebDriverWait(driver, 7)
-
-        # Akceptacja cookies (jeśli się pojawi)
-        try:
-            accept_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//span[text()="Zaakceptuj wszystko"]')))
-            accept_button.click()
-            time.sleep(random.uniform(2, 5)) 
-        except Exception:
-            pass  # Jeśli nie ma przycisku, idziemy dalej
-
-        # Wpisanie adresu w pole wyszukiwania
-        search_box = wait.until(EC.element_to_be_clickable((By.ID, "searchboxinput")))
-        search_box.clear()
-        search_box.send_keys(address)
-        search_box.send_keys(Keys.RETURN)
-
-        time.sleep(5)  # Czekamy na załadowanie wyników
-
-        # Pobieranie linku do mapy
-        map_link = driver.current_url
-
-        # Wyciąganie adresu z wyników wyszukiwania (element <span class="DkEaL">)
-        try:
-            address_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'span.DkEaL')))
-            search_name = address_element.text
-
-            # Sprawdzanie, czy wynik jest zbyt ogólny
-            if "Warszawa" in search_name or "dzielnica" in search_name or len(search_name.split(',')) > 2:
-                search_name = "Nazwa jest zbyt ogólna, aby jednoznacznie zidentyfikować lokalizację."
-        except Exception:
-            search_name = "Brak dokładnego adresu"
-
-    except Exception as e:
-        map_link = f"Błąd: {e}"
-        search_name = "Błąd przy wyszukiwaniu"
-
-    finally:
-        driver.quit()
-
-    return map_link, search_name
-
-def extract_coordinates(map_link):
-    """ Wyciąga współrzędne geograficzne z linku Google Maps. """
-    match = re.search(r'@([-0-9.]+),([-0-9.]+)', map_link)
-    if match:
-        return float(match.group(1)), float(match.group(2))
-    return None, None
-
-def is_valid_address(address):
-    """ Sprawdza, czy adres zawiera przynajmniej jedną literę (aby uniknąć wpisywania samych cyfr). """
-    return bool(re.search(r'[a-zA-ZąćęłńóśźżĄĆĘŁŃÓŚŹŻ]', address))
-
-# Funkcja do tworzenia mapy Folium z czerwonymi znacznikami
-def create_folium_map(locations):
-    # Tworzenie mapy na współrzędnych środkowych
-    m = folium.Map(location=[locations[0]['lat'], locations[0]['lon']], zoom_start=12)   
-    # Dodawanie markerów na mapie z czerwonym kolorem
-    for loc in locations:
-        folium.Marker(
-            [loc['lat'], loc['lon']],
-            popup=loc.get('address', 'Brak adresu'),
-            icon=folium.Icon(color='red') 
-        ).add_to(m)   
-    # Zwracanie mapy jako obiekt HTML
-    return m._repr_html_()
+@st.cache_resource(show_spinner=False)
+def load_asset(path):
+    """ Wczytuje plik statyczny (logo, arkusz stylów) raz na proces zamiast przy każdym przebiegu skryptu. """
+    with open(path, "rb") as handle:
+        return handle.read()
+
+def guess_column(header, prefixes):
+    """ Zwraca indeks pierwszej kolumny, której nazwa zaczyna się od jednego z prefiksów (domyślnie 0). """
+    for index, name in enumerate(header):
+        if name.lower().startswith(prefixes):
+            return index
+    return 0
+
+def split_valid_addresses(addresses):
+    """ Dzieli adresy na poprawne i niepoprawne (bez liter). """
+    valid, invalid = [], []
+    for address in addresses:
+        if is_valid_address(address):
+            valid.append(address)
+        else:
+            invalid.append(address)
+    return valid, invalid
+
+def parse_uploaded_file(file_bytes, file_name, column, progress=None):
+    """ Wczytuje adresy z przesłanego pliku CSV/XLSX partiami i jednokrotnie je waliduje. """
+    rows = iter_table_rows(BytesIO(file_bytes), kind=table_kind(file_name))
+    valid, invalid = [], []
+    for chunk in iter_chunks(iter_column(rows, column), PARSE_CHUNK_SIZE):
+        chunk_valid, chunk_invalid = split_valid_addresses(address for _, address in chunk)
+        valid.extend(chunk_valid)
+        invalid.extend(chunk_invalid)
+        if progress is not None:
+            progress.text(f"📄 Wczytano {len(valid) + len(invalid)} wierszy...")
+    return valid, invalid
+
+# Artefakty pochodne wyników są liczone raz na skrót wyników - argumenty z "_" nie są hashowane przez Streamlit
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_table(table_hash, _results):
+    """ Tworzy DataFrame z wynikami (współrzędne jako liczby - 8 miejsc po przecinku ustawia TABLE_COLUMN_CONFIG). """
+    return _results.to_frame()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_export(table_hash, fmt, _results):
+    """ Zwraca zawartość pliku z wynikami w wybranym formacie (XLSX/CSV/Parquet/GeoJSON). """
+    return export_bytes(_results.records(), fmt, _results.columns())
+
+def build_distance_matrix(table_hash, results):
+    """ Zwraca ścieżkę pliku CSV z macierzą odległości między wynikami (liczoną blokami).
+
+    Macierz nie trafia do cache Streamlit - plik tymczasowy sesji jest liczony ponownie tylko po zmianie wyników.
+    Pliki sesji, które się skończyły, są usuwane po czasie życia zadań (GEO_JOB_TTL) i przy zamknięciu serwera.
+    """
+    previous = st.session_state.get('matrix_file')
+    if previous is not None:
+        if previous[0] == table_hash and os.path.exists(previous[1]):
+            os.utime(previous[1])  # Plik używanej sesji nie jest uznawany za stary
+            return previous[1]
+        remove_matrix_file(previous[1])
+    remove_stale_matrix_files(JOB_TTL)
+    lat, lon = results.coordinates()
+    with st.spinner("Liczenie macierzy odległości..."):
+        path = distance_matrix_file([record["Adres"] for record in results.records()], lat, lon)
+    st.session_state['matrix_file'] = (table_hash, path)
+    return path
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_folium_map(table_hash, _locations):
+    return create_folium_map(_locations)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def build_pydeck_map(table_hash, _locations):
+    return create_pydeck_map(_locations)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_results_html(table_hash, _results):
+    """ Składa szczegółowe wyniki w jeden blok HTML (jedno wywołanie st.markdown zamiast jednego na adres). """
+    return "".join(
+        f"""
+        <div style="display: flex; gap: 20px; align-items: center; margin-bottom: 5px;">
+            <p style="font-size: 14px; font-weight: bold; margin: 0;">🗺️ Adres: {record['Adres']}</p>
+            <p style="font-size: 14px; font-weight: bold; margin: 0;">🔎 Wyszukany adres: {record['Wyszukany adres']}</p>
+        </div>
+        <div style="display: flex; gap: 20px; margin-top: 5px; align-items: center;">
+            <p style="font-size: 14px; font-weight: bold; margin: 0;">
+                🌍 Link: <a href="{record['Link']}" target="_blank">Google Maps</a>
+            </p>
+            <p style="font-size: 14px; font-weight: bold; margin: 0; margin-left: 20px;">📍 {record['Latitude']}, {record['Longitude']}</p>
+        </div>
+        <hr style="border: 1px solid #6f6f6f; margin: 10px 0;">
+        """
+        for record in _results.records()
+    )
+
+def render_map(locations, table_hash=None):
+    """ Wyświetla mapę - przy tysiącach punktów przez pydeck (WebGL), w pozostałych przypadkach przez Folium.
+
+    Z podanym table_hash mapa jest budowana raz i odtwarzana z pamięci przy kolejnych przebiegach skryptu.
+    """
+    if map_mode(locations) == "webgl":
+        deck = build_pydeck_map(table_hash, locations) if table_hash else create_pydeck_map(locations)
+        st.pydeck_chart(deck)
+    else:
+        map_html = build_folium_map(table_hash, locations) if table_hash else create_folium_map(locations)
+        html(map_html, height=500)
 
 
 
 # === STREAMLIT UI ===
+# Endpoint /metrics w formacie Prometheusa (tylko gdy ustawiono GEO_METRICS_PORT; uruchamiany raz na proces)
+serve_metrics()
+
 # Dodanie grafiki i znaku
 
-st.image("impel.jpg", use_container_width=True)
+st.image(load_asset("impel.jpg"), use_container_width=True)
 st.markdown(
     """
     <div style="text-align: center; font-size: 8px; margin-bottom: 10px;">
@@ -119,232 +162,277 @@ st.markdown(
 # Nagłówek h5
 st.markdown('<h5 style="text-align: center; color: currentColor;">🡇 Wpisz adresy poniżej (każdy adres musi być w osobnej linijce) 🡇</h5>', unsafe_allow_html=True)
 
-st.markdown(
-    """
-    <style>
-        /* Stylizacja dla textarea w Streamlit */
-        .stTextArea textarea {
-            background-color: #fcfcfc !important; /* Jasnoszare tło */
-            color: solid #000000 !important;  /* Czarny tekst */
-            border-radius: 10px;  /* Zaokrąglenie rogów */
-            border: 2px solid #6f6f6f;  /* Szara ramka */
-            padding: 10px;  /* Dodatkowy padding */
-            font-size: 16px;  /* Większy rozmiar czcionki */
-            box-shadow: 0 2px 5px rgba(0, 0, 0, 0.1);  /* Lekki cień */
-            resize: vertical;  /* Tylko pionowa możliwość zmiany rozmiaru */
-            caret-color: black;  /* Kolor kursora */
-        }
-
-        /* Stylizacja placeholdera */
-        .stTextArea textarea::placeholder {
-            color: #6f6f6f !important; /* Szary placeholder */
-            opacity: 1; /* Upewnij się, że jest widoczny */
-        }
-    </style>
-    """, unsafe_allow_html=True
-)
+# Wszystkie style aplikacji (pole adresów, przyciski) jednym blokiem
+st.markdown(f"<style>{load_asset('style.css').decode('utf-8')}</style>", unsafe_allow_html=True)
 
 
 # Pole do wpisywania adresów
 addresses_input = st.text_area("**ADRESY:**", placeholder="Wpisz adresy tutaj, jeden pod drugim...")
 
-# Lista na dane do tabeli
-table_data = []
+# Alternatywnie: plik CSV/XLSX z kolumną adresów
+uploaded_file = st.file_uploader("**lub PLIK z adresami (CSV/XLSX):**", type=["csv", "xlsx"])
 
-# Sprawdzenie poprawności wpisanych adresów
+# Sprawdzenie poprawności wpisanych adresów (wynik zapamiętany w sesji - kolejne przebiegi skryptu nie dzielą tekstu od nowa)
 valid_addresses = []
 invalid_addresses = []
 
 if addresses_input.strip():
-    addresses = addresses_input.strip().split("\n")
-    for address in addresses:
-        if is_valid_address(address):
-            valid_addresses.append(address)
-        else:
-            invalid_addresses.append(address)
-
-# Wyświetlenie ostrzeżenia, jeśli są nieprawidłowe adresy
-if invalid_addresses:
-    st.warning(f"🚨 Poniższe adresy są niepoprawne (muszą zawierać przynajmniej jedną literę):\n\n{', '.join(invalid_addresses)} 🚨")
-
-# Lista do przechowywania współrzędnych
-locations = []
-
-# Przycisk "Szukaj" ze stylizacją
-st.markdown(
-    """
-    <style>
-        /* Styl podstawowy dla przycisku */
-        .stButton > button {
-            color: black !important;
-            background-color: #f0f0f0 !important; /* Szare tło */
-            border: 2px solid #6f6f6f !important; /* Szara ramka */
-            border-radius: 10px !important;  /* Zaokrąglenie rogów */
-            box-sizing: border-box !important;
-            cursor: pointer !important;
-            text-transform: uppercase !important; /* Wielkie litery */
-            transition: all 0.3s ease-in-out !important;
-            user-select: none !important; /* Zapobiega zaznaczaniu tekstu */
-        }
-        /* Efekt hover (najechanie kursorem) */
-        .stButton > button:hover {
-            background-color: #d0d0d0 !important; /* Ciemniejszy szary po najechaniu */
-            border-color: #333 !important; /* Ciemniejsza ramka */
-        }     
-        /* Efekt focus (zaznaczenie przycisku) */
-        .stButton > button:focus {
-            box-shadow: 0 0 5px 2px rgba(51, 51, 51, 0.6) !important;
-            outline: none !important;
+    text_hash = hashlib.sha1(addresses_input.encode("utf-8")).hexdigest()
+    parsed_text = st.session_state.get('parsed_text')
+    if parsed_text is None or parsed_text[0] != text_hash:
+        parsed_text = (text_hash, *split_valid_addresses(addresses_input.strip().split("\n")))
+        st.session_state['parsed_text'] = parsed_text
+    valid_addresses.extend(parsed_text[1])
+    invalid_addresses.extend(parsed_text[2])
+
+# Plik jest parsowany raz - wynik trzymamy w sesji pod kluczem (hash pliku, kolumna)
+if uploaded_file is not None:
+    file_bytes = uploaded_file.getvalue()
+    file_hash = hashlib.sha1(file_bytes).hexdigest()
+    parsed_file = st.session_state.get('parsed_file')
+    if parsed_file is None or parsed_file['hash'] != file_hash:
+        parsed_file = {
+            'hash': file_hash,
+            'header': read_header(BytesIO(file_bytes), kind=table_kind(uploaded_file.name)),
+            'columns': {}
         }
-        /* Efekt active (kliknięcie) */
-        .stButton > button:active {
-            border: 2px solid red  !important; /* Szara ramka */
-            transform: scale(0.95) !important; /* Minimalne zmniejszenie przy kliknięciu */
-        }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+        st.session_state['parsed_file'] = parsed_file
+
+    column = st.selectbox("Kolumna z adresami:", parsed_file['header'])
+    if column not in parsed_file['columns']:
+        progress = st.empty()
+        # Pamiętamy tylko ostatnio wybraną kolumnę, żeby nie trzymać w sesji kilku kopii listy
+        parsed_file['columns'] = {column: parse_uploaded_file(file_bytes, uploaded_file.name, column, progress)}
+        progress.empty()
+    file_valid, file_invalid = parsed_file['columns'][column]
+    valid_addresses.extend(file_valid)
+    invalid_addresses.extend(file_invalid)
+    st.caption(f"📄 {uploaded_file.name}: {len(file_valid)} poprawnych adresów")
+
+# Wyświetlenie ostrzeżenia, jeśli są nieprawidłowe adresy (przy długich listach tylko początek)
+if invalid_addresses:
+    shown = ', '.join(invalid_addresses[:20])
+    if len(invalid_addresses) > 20:
+        shown += f" ... (i {len(invalid_addresses) - 20} innych)"
+    st.warning(f"🚨 Poniższe adresy są niepoprawne (muszą zawierać przynajmniej jedną literę):\n\n{shown} 🚨")
 
 
 # Przycisk "Szukaj" jest aktywowany tylko, gdy są poprawne adresy
-if valid_addresses:
-    # Tworzymy układ z przyciskiem i miejscem na napis
-    col1, col2 = st.columns([1, 5])
+job_service = get_job_service()
 
-    with col1:
-        # Kliknięcie "SZUKAJ" resetuje dane
+# Tworzymy układ z przyciskiem i miejscem na napis
+col1, col2 = st.columns([1, 5])
+
+with col1:
+    if valid_addresses:
+        # Kliknięcie "SZUKAJ" wysyła partię do usługi zadań w tle i resetuje dane
         if st.button("SZUKAJ"):
-            st.session_state['search_triggered'] = True
+            job = job_service.submit(valid_addresses)
+            st.session_state['job_id'] = job.id
+            st.query_params['job'] = job.id  # Po odświeżeniu strony zadanie odnajdywane jest po adresie URL
             st.session_state['data_processed'] = False  # Flaga przetworzenia danych
-
-    # Dodanie miejsca na migający napis obok przycisku
-    with col2:
-        placeholder = st.empty()
-
-    # Przetwarzanie danych tylko po kliknięciu "SZUKAJ"
-    if st.session_state.get('search_triggered', False) and not st.session_state.get('data_processed', False):
-        # Migający napis "Przetwarzanie danych..."
-        for i in range(10):
-            color = 'red' if i % 2 == 0 else 'black'
-            placeholder.markdown(f"<p style='color: {color}; font-weight: bold;'>🔄 Przetwarzanie danych...</p>", unsafe_allow_html=True)
-            time.sleep(1)
-        placeholder.empty()
-
-        # Czyścimy poprzednie wyniki
-        st.session_state.results = []
-
-        # Liczba adresów do przetworzenia
-        total_addresses = len(valid_addresses)
-
-        # Przetwarzanie danych
-        table_data = []
-        locations = []
-
-        for index, address in enumerate(valid_addresses, start=1):
-            result_link, search_name = get_google_maps_link(address)
-            latitude, longitude = extract_coordinates(result_link)
-
-            # Dodanie do tabeli
-            if latitude and longitude:
-                table_data.append({
-                    "Adres": address,
-                    "Wyszukany adres": search_name,
-                    "Latitude": latitude,
-                    "Longitude": longitude,
-                    "Link": result_link
-                })
-
-                # Dodajemy do mapy
-                locations.append({'lat': latitude, 'lon': longitude, 'address': search_name})  
-
+    else:
+        st.button("Szukaj", disabled=True)
+
+# Dodanie miejsca na postęp wyszukiwania obok przycisku
+with col2:
+    placeholder = st.empty()
+
+# Zadanie działa w tle niezależnie od przebiegu skryptu - kolejne przebiegi (i odświeżenie strony) tylko odczytują jego stan
+job_key = st.session_state.get('job_id') or st.query_params.get('job')
+job = job_service.get(job_key) if job_key else None
+
+if job is not None and not st.session_state.get('data_processed', False):
+    if len(job.unique) < len(job.addresses):
+        # Duplikaty (różniące się spacjami, wielkością liter, "ul."/"ulica" itp.) wyszukujemy tylko raz
+        st.caption(f"🔁 {len(job.addresses) - len(job.unique)} powtórzonych adresów - wyszukiwanie {len(job.unique)} unikalnych")
+
+    if not job.is_finished:
+        # Miejsca na pasek postępu i wyniki pokazywane na bieżąco
+        if st.button("ANULUJ", key="cancel_job"):
+            job_service.cancel(job.id)
+        progress_bar = st.progress(0.0)
+        live_table = st.empty()
+        live_map = st.empty()
+        map_rendered = 0.0
+        shown = -1
+
+        # Tempo liczone z wyszukiwań ukończonych od podłączenia strony - wyniki z dziennika (wznowienie zadania)
+        # i sprzed odświeżenia strony nie zaniżają czasu na adres
+        attached_at, attached_completed = time.time(), job.completed
+
+        # Odpytywanie stanu zadania - kliknięcie w interfejsie przerywa tylko tę pętlę, nie wyszukiwanie
+        while not job.is_finished:
+            completed = job.completed
+            finished_here = completed - attached_completed
+            if finished_here:
+                per_address = (time.time() - attached_at) / finished_here
+                estimate = f"~{(job.total - completed) * per_address:.0f} s do końca · {per_address:.1f} s/adres"
             else:
-                st.warning("❌ Nie udało się znaleźć współrzędnych.")
-
-        # ✅ Usuwamy napis "Przetwarzanie danych..."
+                estimate = "szacowanie czasu..."
+            progress_bar.progress(completed / job.total)
+            placeholder.markdown(
+                f"<p style='font-weight: bold;'>🔄 {completed}/{job.total} adresów · {estimate}</p>", unsafe_allow_html=True)
+            paused_for = get_breaker().paused_for()
+            if paused_for:
+                placeholder.warning(f"⏸️ Google blokuje zapytania - wyszukiwanie wstrzymane na {paused_for:.0f} s")
+
+            if completed != shown:
+                results = job.result_store()
+                if results:
+                    live_table.dataframe(results.to_frame(), hide_index=True, width=1000, column_config=TABLE_COLUMN_CONFIG)
+                    now = time.monotonic()
+                    if now - map_rendered >= MAP_RENDER_INTERVAL:
+                        with live_map.container():
+                            render_map(results.locations())
+                        map_rendered = now
+                shown = completed
+            time.sleep(RENDER_INTERVAL)
+
+        # ✅ Usuwamy postęp i podgląd - pełne wyniki wyświetlane są poniżej
         placeholder.empty()
+        progress_bar.empty()
+        live_table.empty()
+        live_map.empty()
+
+    if job.status == CANCELLED:
+        st.info(f"⏹️ Wyszukiwanie przerwane - wyszukano {job.completed}/{job.total} adresów")
 
-        # Zapisujemy dane w sesji, by nie znikały po pobraniu
-        st.session_state['table_data'] = table_data
-        st.session_state['locations'] = locations
-        st.session_state['data_processed'] = True
-
-    # ✅ Wyświetlamy tabelę tylko jeśli są dane
-    if st.session_state.get('data_processed', False):
-        table_data = st.session_state['table_data']
-        locations = st.session_state['locations']
-
-        if table_data:
-            df_table = pd.DataFrame(table_data)
-
-            # Ustawienie precyzji na 8 miejsc po przecinku
-            df_table["Latitude"] = df_table["Latitude"].astype(float).map('{:.8f}'.format)
-            df_table["Longitude"] = df_table["Longitude"].astype(float).map('{:.8f}'.format)
-
-            # Wyświetlenie tabeli
-            st.markdown("<h4 style='text-align: left; border-bottom: 2px solid #6f6f6f; padding-bottom: 5px;'>📋 Tabela z wynikami (można skopiować lub pobrać jako Excel)</h4>", unsafe_allow_html=True)
-            st.data_editor(df_table, hide_index=True, width=1000)
-
-            # 📥 Dodanie przycisku pobrania pliku Excel
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                df_table.to_excel(writer, sheet_name="Wspolrzedne_geograficzne", index=False)
-            output.seek(0)
-
-            st.markdown("""
-            <style>
-            /* Styl podstawowy dla przycisku */
-            .stDownloadButton > button {
-                color: black !important;
-                background-color: #f0f0f0 !important; /* Szare tło */
-                border: 2px solid #6f6f6f !important; /* Szara ramka */
-                border-radius: 10px !important;  /* Zaokrąglenie rogów */
-                box-sizing: border-box !important;
-                cursor: pointer !important;
-            }
-            </style>
-        """, unsafe_allow_html=True)
-            
-            # Przycisk pobrania Excela (bez resetu danych)
-            st.download_button(
-                label="📥 Pobierz plik Excel",
-                data=output,
-                file_name="Wspolrzedne_geograficzne.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                key="excel_download"
-            )
-
-        # ✅ Wyświetlamy mapę jako drugą
-        if locations:
-            st.markdown("<h4 style='text-align: left; border-bottom: 2px solid #6f6f6f; padding-bottom: 5px;'>🗺️ Mapa z zaznaczonymi punktami:</h4>", unsafe_allow_html=True)
-            map_html = create_folium_map(locations)
-            html(map_html, height=500)
-
-        # ✅ Na końcu wyświetlamy szczegółowe wyniki (przywrócona oryginalna struktura)
-        if table_data:
-            st.markdown("<h4 style='text-align: left; border-bottom: 2px solid #6f6f6f; padding-bottom: 5px;'>📊 Wyniki:</h4>", unsafe_allow_html=True)
-
-            for record in table_data:
-                st.markdown(
-                    f"""
-                    <div style="display: flex; gap: 20px; align-items: center; margin-bottom: 5px;">
-                        <p style="font-size: 14px; font-weight: bold; margin: 0;">🗺️ Adres: {record['Adres']}</p>
-                        <p style="font-size: 14px; font-weight: bold; margin: 0;">🔎 Wyszukany adres: {record['Wyszukany adres']}</p>
-                    </div>
-                    <div style="display: flex; gap: 20px; margin-top: 5px; align-items: center;">
-                        <p style="font-size: 14px; font-weight: bold; margin: 0;">
-                            🌍 Link: <a href="{record['Link']}" target="_blank">Google Maps</a>
-                        </p>
-                        <p style="font-size: 14px; font-weight: bold; margin: 0; margin-left: 20px;">📍 {record['Latitude']}, {record['Longitude']}</p>
-                    </div>
-                    <hr style="border: 1px solid #6f6f6f; margin: 10px 0;">
-                    """,
-                    unsafe_allow_html=True
-                )
-
-
-else:
-    st.button("Szukaj", disabled=True)
+    for address, search_name, result_link in job.failures():
+        if result_link.startswith("Błąd"):
+            st.warning(f"❌ Nie udało się znaleźć współrzędnych: {address} ({search_name})")
+        else:
+            st.warning(f"❌ Nie udało się znaleźć współrzędnych: {address}")
+
+    # Statystyki cache (trafienia nie wymagają uruchamiania przeglądarki)
+    cache_stats = get_cache().stats()
+    st.caption(f"💾 Cache: {cache_stats['hits']} trafień, {cache_stats['misses']} chybień, {cache_stats['size']} zapisanych adresów")
+
+    # Podsumowanie partii: czasy poszczególnych etapów wyszukiwania i wyniki
+    job_summary = job.metrics.summary()
+    with st.expander("⏱️ Podsumowanie czasów wyszukiwania"):
+        if job_summary['stages']:
+            import pandas as pd
+            st.dataframe(pd.DataFrame([
+                {"Etap": stage, "Liczba": values['count'], "Średni czas [s]": round(values['mean_s'], 3)}
+                for stage, values in job_summary['stages'].items()
+            ]), hide_index=True)
+        st.write(", ".join(f"{name}: {value}" for name, value in sorted(job_summary['counters'].items())))
+
+    # Zapisujemy dane w sesji, by nie znikały po pobraniu - wyniki w kolejności adresów wejściowych
+    st.session_state['job_id'] = job.id
+    st.session_state['results'] = job.result_store()
+    st.session_state['data_processed'] = True
+
+# ✅ Wyświetlamy tabelę tylko jeśli są dane
+if st.session_state.get('data_processed', False):
+    results = st.session_state['results']
+
+    # 📏 Przypisanie każdego adresu do najbliższego punktu z drugiej listy (np. magazynów) i macierz odległości
+    if results:
+        with st.expander("📏 Odległości i najbliższe punkty (np. magazyny)"):
+            sites_file = st.file_uploader("**PLIK z punktami (CSV/XLSX) - nazwa i współrzędne:**", type=["csv", "xlsx"], key="sites_file")
+            if sites_file is not None:
+                sites_bytes = sites_file.getvalue()
+                sites_kind = table_kind(sites_file.name)
+                sites_header = read_header(BytesIO(sites_bytes), kind=sites_kind)
+                col_name, col_lat, col_lon = st.columns(3)
+                with col_name:
+                    site_name_column = st.selectbox("Nazwa punktu:", sites_header, key="site_name_column")
+                with col_lat:
+                    site_lat_column = st.selectbox("Latitude:", sites_header, key="site_lat_column",
+                                                   index=guess_column(sites_header, ("lat", "szer")))
+                with col_lon:
+                    site_lon_column = st.selectbox("Longitude:", sites_header, key="site_lon_column",
+                                                   index=guess_column(sites_header, ("lon", "lng", "dług", "dlug")))
+
+                if st.button("PRZYPISZ NAJBLIŻSZE"):
+                    sites, skipped = read_sites(BytesIO(sites_bytes), site_name_column, site_lat_column, site_lon_column, kind=sites_kind)
+                    if skipped:
+                        st.warning(f"🚨 Pominięto {skipped} wierszy bez poprawnych współrzędnych")
+                    if sites[0]:
+                        # Kolumny z najbliższym punktem i odległością trafiają do tabeli i eksportu
+                        assign_to_sites(results, sites)
+                        st.caption(f"📏 Przypisano {len(results)} adresów do {len(sites[0])} punktów")
+                    else:
+                        st.warning("🚨 W pliku nie ma punktów z poprawnymi współrzędnymi")
+
+            if st.checkbox("Macierz odległości między wszystkimi wynikami (CSV)", key="distance_matrix"):
+                if len(results) > MATRIX_MAX_POINTS:
+                    st.warning(f"🚨 Macierz odległości jest dostępna dla najwyżej {MATRIX_MAX_POINTS} wyników (jest {len(results)}) - "
+                               f"dla większych list użyj przypisania do najbliższych punktów")
+                else:
+                    # Streamlit wczytuje plik do pamięci na czas przebiegu - dlatego liczba punktów jest ograniczona
+                    with open(build_distance_matrix(results.content_hash(), results), "rb") as matrix_file:
+                        st.download_button(
+                            label="📥 Pobierz macierz odległości [m]",
+                            data=matrix_file,
+                            file_name="Macierz_odleglosci.csv",
+                            mime="text/csv",
+                            key="matrix_download"
+                        )
+
+    # Skrót wyników - niezmienione wyniki nie są przeliczane przy kolejnych przebiegach skryptu
+    table_hash = results.content_hash()
+
+    if results:
+        df_table = build_table(table_hash, results)
+
+        # Wyświetlenie tabeli
+        st.markdown("<h4 style='text-align: left; border-bottom: 2px solid #6f6f6f; padding-bottom: 5px;'>📋 Tabela z wynikami (można skopiować lub pobrać jako Excel)</h4>", unsafe_allow_html=True)
+        st.data_editor(df_table, hide_index=True, width=1000, column_config=TABLE_COLUMN_CONFIG)
+
+        # 📥 Wybór formatu pliku z wynikami (Excel lub formaty dla narzędzi GIS)
+        export_format = st.selectbox(
+            "Format pliku:", list(EXPORT_FORMATS), format_func=lambda fmt: EXPORT_FORMATS[fmt][0], key="export_format")
+        label, mime, extension = EXPORT_FORMATS[export_format]
+
+        # Przycisk pobrania pliku (bez resetu danych)
+        st.download_button(
+            label=f"📥 Pobierz plik {label}",
+            data=build_export(table_hash, export_format, results),
+            file_name=f"Wspolrzedne_geograficzne.{extension}",
+            mime=mime,
+            key="excel_download"
+        )
+
+    # ✅ Wyświetlamy mapę jako drugą
+    if results:
+        st.markdown("<h4 style='text-align: left; border-bottom: 2px solid #6f6f6f; padding-bottom: 5px;'>🗺️ Mapa z zaznaczonymi punktami:</h4>", unsafe_allow_html=True)
+        render_map(results.locations(), table_hash)
+
+    # ✅ Na końcu wyświetlamy szczegółowe wyniki (przywrócona oryginalna struktura)
+    if results:
+        st.markdown("<h4 style='text-align: left; border-bottom: 2px solid #6f6f6f; padding-bottom: 5px;'>📊 Wyniki:</h4>", unsafe_allow_html=True)
+
+        st.markdown(build_results_html(table_hash, results), unsafe_allow_html=True)
+
+
+# === WYSZUKIWANIE ODWROTNE ===
+# Najbliższe znane adresy dla podanych współrzędnych (spośród wszystkich punktów znalezionych przez aplikację)
+with st.expander("🧭 Najbliższe znane adresy dla współrzędnych"):
+    col_lat, col_lon = st.columns(2)
+    with col_lat:
+        reverse_lat = st.number_input("Latitude", min_value=-90.0, max_value=90.0, value=52.2297, format="%.6f")
+    with col_lon:
+        reverse_lon = st.number_input("Longitude", min_value=-180.0, max_value=180.0, value=21.0122, format="%.6f")
+    col_k, col_radius = st.columns(2)
+    with col_k:
+        reverse_k = st.number_input("Liczba najbliższych adresów", min_value=1, max_value=100, value=5)
+    with col_radius:
+        reverse_radius = st.number_input("lub promień [m] (0 = bez promienia)", min_value=0, value=0, step=100)
+
+    if st.button("ZNAJDŹ NAJBLIŻSZE"):
+        spatial_index = get_spatial_index()
+        if reverse_radius:
+            nearby = spatial_index.within_radius(reverse_lat, reverse_lon, reverse_radius)
+        else:
+            nearby = spatial_index.nearest(reverse_lat, reverse_lon, int(reverse_k))
+        if nearby:
+            import pandas as pd
+            st.dataframe(pd.DataFrame(nearby), hide_index=True, width=1000)
+        else:
+            st.info(f"Brak znanych adresów (w indeksie: {len(spatial_index)} punktów).")
 
 
 
@@ -0,0 +1,127 @@
+# Importy wbudowane
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Moduły aplikacji
+from metrics import METRICS, Metrics
+
+# === KONFIGURACJA ===
+# Liczba równoległych wyszukiwań - domyślnie tyle, ile kart mają wszystkie przeglądarki w puli
+BATCH_WORKERS = int(os.environ.get("GEO_BATCH_WORKERS",
+                                   int(os.environ.get("GEO_POOL_SIZE", 2)) * int(os.environ.get("GEO_POOL_TABS", 1))))
+BATCH_RATE = float(os.environ.get("GEO_BATCH_RATE", 1.0))  # Globalny limit wyszukiwań na sekundę (0 = bez limitu)
+BATCH_BACKEND = os.environ.get("GEO_BATCH_BACKEND", "thread")  # "thread" albo "process"
+
+
+# === LIMITER ===
+class RateLimiter:
+    """ Globalny limiter zapytań - pilnuje minimalnego odstępu między kolejnymi wyszukiwaniami. """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """ Blokuje do momentu, w którym można wysłać kolejne zapytanie. """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class SharedRateLimiter:
+    """ Limiter wspólny dla procesów potomnych backendu "process" - czas następnego zapytania jest w pamięci współdzielonej.
+
+    Przekazywany jest do procesów przy ich uruchamianiu (initializer puli), więc działa też przy metodzie "spawn".
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next_time = multiprocessing.Value("d", 0.0)
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._next_time.get_lock():
+            now = time.monotonic()
+            start = max(now, self._next_time.value)
+            self._next_time.value = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """ Zwraca limiter zapytań sieciowych współdzielony w procesie (trafienia w cache i spisie adresów go omijają). """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(BATCH_RATE)
+        return _limiter
+
+def set_rate_limiter(limiter):
+    """ Podmienia limiter zapytań (np. z limitem z linii poleceń albo bez limitu w benchmarkach). """
+    global _limiter
+    with _limiter_lock:
+        _limiter = limiter
+
+
+# === SILNIK WSADOWY ===
+def _measured_call(lookup, item):
+    """ Wywołuje lookup(item) w procesie potomnym i zwraca wynik razem z pomiarami tego wywołania. """
+    measured = Metrics()
+    with METRICS.recording_to(measured):
+        result = lookup(item)
+    return result, measured.export()
+
+def iter_batch(items, lookup, workers=BATCH_WORKERS, backend=BATCH_BACKEND):
+    """ Wykonuje lookup(item) równolegle i zwraca pary (indeks, wynik) w kolejności ukończenia.
+
+    Zadania są zlecane przez wątek wywołujący, więc liczba zadań w locie obowiązuje globalnie
+    niezależnie od backendu; limit zapytań stosuje lookup_address tylko do zapytań sieciowych.
+    Dla backendu "process" funkcja lookup musi dać się zaimportować (zdefiniowana na poziomie modułu),
+    a procesy potomne dostają jeden wspólny limiter z limitem bieżącego limitera procesu. Metryki
+    z procesów potomnych wracają razem z wynikami i są dodawane do METRICS procesu wywołującego.
+    """
+    workers = max(1, int(workers))
+    processes = backend == "process"
+    if processes:
+        limiter = SharedRateLimiter(get_rate_limiter().interval)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=set_rate_limiter, initargs=(limiter,))
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    def submit(item):
+        return executor.submit(_measured_call, lookup, item) if processes else executor.submit(lookup, item)
+
+    def result(future):
+        if not processes:
+            return future.result()
+        value, measured = future.result()
+        METRICS.merge(measured)
+        return value
+
+    with executor:
+        in_flight = {}
+        for index, item in enumerate(items):
+            # Nie zlecamy więcej zadań, niż jest wolnych workerów
+            while len(in_flight) >= workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield in_flight.pop(future), result(future)
+            in_flight[submit(item)] = index
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), result(future)
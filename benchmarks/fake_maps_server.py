@@ -0,0 +1,150 @@
+""" Lokalna atrapa Map Google do benchmarków - bez ruchu do prawdziwego Google.
+
+Strona /maps naśladuje to, czego używa aplikacja: przycisk "Zaakceptuj wszystko", pole #searchboxinput,
+link "/maps/place/.../@lat,lon" i element span.DkEaL. /maps/search/<adres> przekierowuje (jak Google przy
+jednoznacznym wyniku) na link miejsca z pinezką !3d…!4d… - z niego korzysta backend HTTP. To zachowanie atrapy,
+nie nagrana odpowiedź Google. Opóźnienie i odsetek błędów są konfigurowalne, a wyniki powtarzalne (zależą od adresu);
+przy blocked=True wyszukiwania dostają odpowiedź 429 (jak przy blokadzie zapytań).
+
+Uruchomienie samodzielne:
+    python -m benchmarks.fake_maps_server --port 8765 --delay 0.3 --failure-rate 0.05
+"""
+# Importy wbudowane
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from html import escape
+from urllib.parse import urlparse, parse_qs, unquote, quote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MAPS_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Mapy Google</title></head>
+<body>
+<div id="consent"><button onclick="document.getElementById('consent').remove()"><span>Zaakceptuj wszystko</span></button></div>
+<input id="searchboxinput" type="text">
+<div id="pane"></div>
+<script>
+const pane = document.getElementById('pane');
+document.getElementById('searchboxinput').addEventListener('keydown', function (event) {
+    if (event.key !== 'Enter') return;
+    const query = this.value;
+    pane.innerHTML = '';
+    fetch('/api/place?q=' + encodeURIComponent(query)).then(r => r.json()).then(place => {
+        setTimeout(() => {
+            if (!place.found) {
+                pane.textContent = 'Mapy Google nie mogą znaleźć: ' + query;
+                return;
+            }
+            history.pushState(null, '', '/maps/place/' + encodeURIComponent(place.name) + '/@' + place.lat + ',' + place.lon
+                + ',17z/data=!3d' + place.lat + '!4d' + place.lon);
+            const span = document.createElement('span');
+            span.className = 'DkEaL';
+            span.textContent = place.name;
+            pane.appendChild(span);
+        }, place.delay_ms);
+    });
+});
+</script>
+</body></html>
+"""
+
+PLACE_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<meta content="{name} · Mapy Google" property="og:title">
+<meta content="https://maps.google.com/maps/api/staticmap?center={lat}%2C{lon}&amp;zoom=17" property="og:image">
+</head><body><script>window.APP_STATE = "data=!3d{lat}!4d{lon}";</script></body></html>
+"""
+
+
+# === ATRAPA ===
+class FakeMaps:
+    """ Konfiguracja atrapy: średnie opóźnienie (s), rozrzut i odsetek wyszukiwań kończących się błędem. """
+
+    def __init__(self, delay=0.2, jitter=0.5, failure_rate=0.0, seed=0, blocked=False):
+        self.delay = delay
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.blocked = blocked
+
+    def place(self, query):
+        """ Zwraca powtarzalny wynik dla adresu: współrzędne w Polsce, opóźnienie i informację o błędzie. """
+        rng = random.Random(zlib.crc32(query.encode("utf-8")) ^ self.seed)
+        return {
+            "found": rng.random() >= self.failure_rate,
+            "name": f"{query.split(',')[0].strip()}, 00-{rng.randint(0, 999):03d} Testowo",
+            "lat": round(rng.uniform(49.0, 54.8), 7),
+            "lon": round(rng.uniform(14.1, 24.1), 7),
+            "delay_ms": int(1000 * self.delay * rng.uniform(1 - self.jitter, 1 + self.jitter)),
+        }
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive jak w prawdziwym serwerze
+
+        def _send(self, status, body, content_type="text/html; charset=utf-8"):
+            body = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _redirect(self, location):
+            self.send_response(302)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.rstrip("/") == "/maps":
+                self._send(200, MAPS_PAGE)
+            elif url.path == "/api/place":
+                query = parse_qs(url.query).get("q", [""])[0]
+                self._send(200, json.dumps(fake.place(query)), "application/json")
+            elif url.path.startswith("/maps/search/") and fake.blocked:
+                self._send(429, "Too Many Requests")
+            elif url.path.startswith("/maps/search/"):
+                place = fake.place(unquote(url.path[len("/maps/search/"):]))
+                time.sleep(place["delay_ms"] / 1000)
+                if not place["found"]:
+                    self._send(503, "Service Unavailable")
+                else:
+                    self._redirect(f"/maps/place/{quote(place['name'])}/@{place['lat']},{place['lon']},17z"
+                                   f"/data=!3d{place['lat']}!4d{place['lon']}")
+            elif url.path.startswith("/maps/place/"):
+                name = unquote(url.path[len("/maps/place/"):].split("/")[0])
+                place = fake.place(name)  # Współrzędne w treści strony różnią się od pinezki w linku - backend ich nie używa
+                self._send(200, PLACE_PAGE.format(name=escape(name), lat=place["lat"], lon=place["lon"]))
+            else:
+                self._send(404, "Not Found")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_server(fake, host="127.0.0.1", port=0):
+    """ Uruchamia atrapę w wątku w tle i zwraca (serwer, bazowy URL). """
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokalna atrapa Map Google do benchmarków.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.2, help="Średnie opóźnienie wyniku (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Względny rozrzut opóźnienia (0-1)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Odsetek wyszukiwań bez wyniku (0-1)")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(FakeMaps(args.delay, args.jitter, args.failure_rate)))
+    print(f"Atrapa Map Google: http://127.0.0.1:{args.port}/maps")
+    server.serve_forever()
@@ -0,0 +1,88 @@
+""" Pomiar czasu importu modułów aplikacji (zimny start) - każdy pomiar w świeżym procesie Pythona.
+
+Raportuje medianę czasu importu i ciężkie biblioteki (Selenium, pandas, Folium...), które import pociągnął.
+Dla pełnego rozbicia na moduły można użyć wbudowanego: python -X importtime -c "import geocoder".
+
+Przykład (z katalogu repozytorium):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --modules geocoder,map_view --repeat 10 --json importy.json
+"""
+# Importy wbudowane
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Moduły importowane przez app_final.py przed pierwszym wyświetleniem strony
+APP_MODULES = [
+    "streamlit", "geocoder", "batch", "journal", "geocode_cache", "address_normalizer", "map_view",
+    "spatial_index", "metrics", "resilience", "export", "result_store", "file_io", "job_service", "distances",
+]
+# Biblioteki, które powinny ładować się dopiero w miejscu użycia
+HEAVY_MODULES = ["selenium", "webdriver_manager", "psutil", "requests", "pandas", "numpy", "folium", "pydeck",
+                 "openpyxl", "xlsxwriter", "pyarrow"]
+
+MEASURE = """
+import sys, time, json
+started = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+# === FUNKCJE ===
+def measure(modules, repeat=5):
+    """ Importuje moduły repeat razy (za każdym razem w nowym procesie) i zwraca medianę czasu i załadowane ciężkie biblioteki. """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", MEASURE.format(modules=modules, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "modules": modules,
+        "median_ms": round(statistics.median(run["seconds"] for run in runs) * 1000, 1),
+        "heavy": runs[-1]["heavy"],
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pomiar czasu importu modułów aplikacji.")
+    parser.add_argument("--modules", help="Moduły do zmierzenia osobno (po przecinku); domyślnie każdy moduł aplikacji")
+    parser.add_argument("--repeat", type=int, default=5, help="Liczba pomiarów na moduł (mediana)")
+    parser.add_argument("--json", help="Zapisz wyniki do pliku JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = [name.strip() for name in args.modules.split(",")] if args.modules else APP_MODULES
+
+    results = []
+    for name in names:
+        try:
+            result = measure([name], args.repeat)
+        except subprocess.CalledProcessError as error:
+            print(f"{name:20} błąd importu: {error.stderr.strip().splitlines()[-1]}", file=sys.stderr)
+            continue
+        results.append(result)
+        print(f"{name:20} {result['median_ms']:>8} ms  ciężkie: {', '.join(result['heavy']) or '-'}")
+
+    # Cały zestaw importów strony głównej naraz (wspólne zależności liczone raz)
+    if not args.modules:
+        try:
+            total = measure(APP_MODULES, args.repeat)
+        except subprocess.CalledProcessError as error:
+            print(f"{'(razem)':20} błąd importu: {error.stderr.strip().splitlines()[-1]}", file=sys.stderr)
+        else:
+            results.append(total)
+            print(f"{'(razem)':20} {total['median_ms']:>8} ms  ciężkie: {', '.join(total['heavy']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
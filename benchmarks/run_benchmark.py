@@ -0,0 +1,220 @@
+""" Powtarzalny benchmark potoku wyszukiwania na lokalnej atrapie Map Google.
+
+Uruchamia prawdziwy kod (lookup_address, iter_batch, backendy HTTP/Selenium) dla różnych liczby adresów
+i liczby workerów, raportuje adresy/min, opóźnienia p50/p95/p99 i szczytowe zużycie pamięci.
+
+Przykład (z katalogu repozytorium):
+    python -m benchmarks.run_benchmark --backends http,selenium --sizes 1,10,1000 --workers 1,4,16
+    python -m benchmarks.run_benchmark --backends selenium --profiles lean,standard --sizes 10 --workers 4
+    python -m benchmarks.run_benchmark --backends selenium --tabs 1,4 --sizes 100 --workers 8
+    python -m benchmarks.run_benchmark --json wyniki.json --baseline poprzednie.json --tolerance 0.2
+"""
+# Importy wbudowane
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import threading
+
+# Importy zewnętrzne
+import psutil
+
+# Moduły aplikacji
+from benchmarks.fake_maps_server import FakeMaps, start_server
+
+
+# === POMIAR PAMIĘCI ===
+class PeakMemory:
+    """ Próbkuje w tle łączny RSS procesu i jego potomków (przeglądarek) i zapamiętuje maksimum. """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        process = psutil.Process()
+        total = 0
+        for item in [process] + process.children(recursive=True):
+            try:
+                total += item.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_mb = max(self.peak_mb, total / (1024 * 1024))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+# === FUNKCJE ===
+def percentile(values, fraction):
+    """ Percentyl metodą najbliższej rangi (values posortowane rosnąco). """
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+def run_scenario(lookup, backend, size, workers, run_id):
+    """ Wyszukuje size unikalnych adresów przy workers równoległych wyszukiwaniach i zwraca wyniki pomiaru. """
+    from batch import iter_batch, set_rate_limiter, RateLimiter
+    from geocoder import extract_coordinates
+    from metrics import METRICS
+
+    addresses = [f"ul. Benchmarkowa {index}, {backend}-{run_id}" for index in range(1, size + 1)]
+    latencies = []
+    latencies_lock = threading.Lock()
+
+    def timed_lookup(address):
+        started = time.perf_counter()
+        result = lookup(address)
+        with latencies_lock:
+            latencies.append(time.perf_counter() - started)
+        return result
+
+    set_rate_limiter(RateLimiter(0))  # Benchmark mierzy potok bez limitu zapytań
+    found = 0
+    metrics_start = METRICS.snapshot()
+    with PeakMemory() as memory:
+        started = time.perf_counter()
+        for _, (map_link, _) in iter_batch(addresses, timed_lookup, workers=workers, backend="thread"):
+            if extract_coordinates(map_link)[0] is not None:
+                found += 1
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    summary = METRICS.summary_since(metrics_start)
+    page_load = summary["stages"].get("page_load")
+    return {
+        "backend": backend,
+        "size": size,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "addresses_per_min": round(size / elapsed * 60, 1),
+        "p50_s": round(percentile(latencies, 0.50), 4),
+        "p95_s": round(percentile(latencies, 0.95), 4),
+        "p99_s": round(percentile(latencies, 0.99), 4),
+        "peak_rss_mb": round(memory.peak_mb, 1),
+        "found": found,
+        # Uruchomienia przeglądarek w tym scenariuszu (puste dla backendu HTTP i ciepłej puli)
+        "page_load_s": round(page_load["mean_s"], 3) if page_load else None,
+        "page_load_kb": round(summary["counters"].get("page_load_bytes", 0) / 1024 / page_load["count"], 1) if page_load else None,
+    }
+
+def compare_with_baseline(results, baseline, tolerance):
+    """ Zwraca listę regresji: spadek przepustowości lub wzrost p95 ponad tolerance względem baseline. """
+    previous = {(item["backend"], item["size"], item["workers"]): item for item in baseline}
+    regressions = []
+    for item in results:
+        old = previous.get((item["backend"], item["size"], item["workers"]))
+        if old is None:
+            continue
+        if item["addresses_per_min"] < old["addresses_per_min"] * (1 - tolerance):
+            regressions.append(f"{item['backend']} n={item['size']} w={item['workers']}: "
+                               f"{item['addresses_per_min']} < {old['addresses_per_min']} adresów/min")
+        if item["p95_s"] > old["p95_s"] * (1 + tolerance):
+            regressions.append(f"{item['backend']} n={item['size']} w={item['workers']}: "
+                               f"p95 {item['p95_s']} s > {old['p95_s']} s")
+    return regressions
+
+def parse_list(text, cast=int):
+    return [cast(value) for value in text.split(",") if value.strip()]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark potoku wyszukiwania na lokalnej atrapie Map Google.")
+    parser.add_argument("--backends", default="http", help="Backendy do zmierzenia: http, selenium")
+    parser.add_argument("--profiles", default="lean", help="Profile przeglądarki dla backendu selenium: lean, standard")
+    parser.add_argument("--tabs", default="1", help="Liczby kart w jednej przeglądarce dla backendu selenium")
+    parser.add_argument("--sizes", default="1,10,1000", help="Liczby adresów w partii")
+    parser.add_argument("--workers", default="1,4,16", help="Liczby równoległych wyszukiwań")
+    parser.add_argument("--delay", type=float, default=0.2, help="Średnie opóźnienie atrapy (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Względny rozrzut opóźnienia atrapy (0-1)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Odsetek wyszukiwań bez wyniku (0-1)")
+    parser.add_argument("--json", help="Zapisz wyniki do pliku JSON")
+    parser.add_argument("--baseline", help="Plik JSON z poprzednimi wynikami do porównania")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Dopuszczalne pogorszenie względem baseline")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    backends, sizes, workers_list = parse_list(args.backends, str), parse_list(args.sizes), parse_list(args.workers)
+    profiles, tabs_list = parse_list(args.profiles, str), parse_list(args.tabs)
+
+    server, base_url = start_server(FakeMaps(args.delay, args.jitter, args.failure_rate))
+    work_dir = tempfile.mkdtemp(prefix="geo-bench-")
+    # Konfiguracja musi być ustawiona przed importem modułów aplikacji
+    os.environ.update({
+        "GEO_MAPS_URL": f"{base_url}/maps",
+        "GEO_HTTP_BASE_URL": base_url,
+        "GEO_CACHE_PATH": os.path.join(work_dir, "cache.sqlite3"),
+        "GEO_JOURNAL_DIR": os.path.join(work_dir, "journals"),
+        "GEO_GAZETTEER_PATH": "",
+        "GEO_POOL_SIZE": str(max(workers_list)),
+    })
+    from geocoder import lookup_address, get_google_maps_link, set_resolver
+    from resolvers import ChainResolver, HttpResolver, SeleniumResolver
+    from driver_pool import DriverPool, get_pool, set_pool
+
+    # Każdy profil przeglądarki i liczba kart mierzone są jako osobny backend (z własną pulą)
+    variants = []
+    for backend in backends:
+        if backend == "http":
+            variants.append(backend)
+        else:
+            variants.extend(f"{backend}-{profile}-x{tabs}" for profile in profiles for tabs in tabs_list)
+
+    results = []
+    run_id = int(time.time())
+    try:
+        for backend in variants:
+            if backend == "http":
+                set_resolver(ChainResolver([HttpResolver(base_url=base_url, pool_size=max(workers_list))]))
+            else:
+                _, profile, tabs = backend.split("-")
+                tabs = int(tabs[1:])
+                get_pool().close()
+                set_pool(DriverPool(size=math.ceil(max(workers_list) / tabs), profile=profile, tabs=tabs))
+                set_resolver(ChainResolver([SeleniumResolver(get_google_maps_link)]))
+            for size in sizes:
+                for workers in workers_list:
+                    result = run_scenario(lookup_address, backend, size, workers, f"{run_id}-{size}-{workers}")
+                    results.append(result)
+                    print(f"{backend:19} n={size:<5} w={workers:<3} {result['addresses_per_min']:>9} adr/min  "
+                          f"p50={result['p50_s']:.3f}s p95={result['p95_s']:.3f}s p99={result['p99_s']:.3f}s  "
+                          f"RSS={result['peak_rss_mb']} MB  znaleziono={result['found']}/{size}"
+                          + (f"  strona={result['page_load_s']}s/{result['page_load_kb']} KB" if result['page_load_s'] else ""))
+    finally:
+        if "selenium" in backends:
+            get_pool().close()
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare_with_baseline(results, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESJA: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+""" Wsadowe wyszukiwanie współrzędnych bez interfejsu Streamlit (np. z crona).
+
+Przykład:
+    python cli.py adresy.csv wyniki.csv --column Adres --workers 4
+    python cli.py linki.csv wspolrzedne.csv --column Link --from-links
+"""
+# Importy wbudowane
+import sys
+import time
+import argparse
+
+# Moduły aplikacji
+from geocoder import geocode_address, is_valid_address, extract_coordinates_batch
+from batch import iter_batch, set_rate_limiter, RateLimiter, BATCH_WORKERS, BATCH_RATE, BATCH_BACKEND
+from file_io import iter_table_rows, iter_column, iter_chunks, ResultWriter
+from journal import Journal, is_final_result
+from metrics import METRICS, write_textfile
+
+LINK_CHUNK_SIZE = 50000  # Liczba linków przetwarzanych jednym wektorowym przebiegiem w trybie --from-links
+
+
+# === FUNKCJE ===
+def process_row(item):
+    """ Wyszukuje adres z wiersza pliku; niepoprawne adresy są zwracane bez wyszukiwania. """
+    row_number, address = item
+    if is_valid_address(address):
+        record = geocode_address(address)
+    else:
+        record = {"Adres": address, "Wyszukany adres": "Niepoprawny adres (brak liter)",
+                  "Latitude": None, "Longitude": None, "Link": ""}
+    record["Wiersz"] = row_number
+    return record
+
+def extract_links(args):
+    """ Tryb --from-links: współrzędne z kolumny gotowych linków Google Maps, bez żadnych wyszukiwań. """
+    rows = iter_table_rows(args.input, sheet=args.sheet)
+    found = total = 0
+    with ResultWriter(args.output) as writer:
+        for chunk in iter_chunks(iter_column(rows, args.column, has_header=not args.no_header), LINK_CHUNK_SIZE):
+            coordinates = extract_coordinates_batch([link for _, link in chunk])
+            for (row_number, link), latitude, longitude in zip(
+                    chunk, coordinates["Latitude"].tolist(), coordinates["Longitude"].tolist()):
+                has_coordinates = latitude == latitude and longitude == longitude  # NaN != NaN
+                writer.write({"Wiersz": row_number, "Latitude": latitude if has_coordinates else None,
+                              "Longitude": longitude if has_coordinates else None, "Link": link})
+                found += has_coordinates
+            total += len(chunk)
+    print(f"Gotowe: {found} z {total} linków ze współrzędnymi", file=sys.stderr)
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Wyszukiwarka współrzędnych geograficznych - tryb wsadowy.")
+    parser.add_argument("input", help="Plik wejściowy CSV/XLSX z adresami")
+    parser.add_argument("output", help="Plik wynikowy CSV/XLSX (zapisywany na bieżąco)")
+    parser.add_argument("--column", help="Nazwa lub numer (od 1) kolumny z adresami; domyślnie pierwsza")
+    parser.add_argument("--sheet", help="Arkusz w pliku XLSX; domyślnie pierwszy")
+    parser.add_argument("--no-header", action="store_true", help="Plik wejściowy nie ma wiersza nagłówka")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Liczba równoległych wyszukiwań")
+    parser.add_argument("--rate", type=float, default=BATCH_RATE, help="Limit wyszukiwań sieciowych na sekundę (0 = bez limitu; cache nie jest ograniczany)")
+    parser.add_argument("--backend", choices=["thread", "process"], default=BATCH_BACKEND)
+    parser.add_argument("--journal", help="Dziennik ukończonych wierszy (domyślnie <output>.journal)")
+    parser.add_argument("--restart", action="store_true", help="Ignoruj dziennik i zacznij partię od początku")
+    parser.add_argument("--metrics-file", help="Zapisz metryki w formacie Prometheusa do pliku (kolektor textfile)")
+    parser.add_argument("--from-links", action="store_true",
+                        help="Kolumna zawiera linki Google Maps - tylko odczyt współrzędnych, bez wyszukiwania")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.from_links:
+        return extract_links(args)
+
+    journal = Journal(args.journal or f"{args.output}.journal")
+    if args.restart:
+        journal.discard()
+
+    # Wiersze zapisane w dzienniku zostały już wyszukane - po restarcie je pomijamy
+    completed = journal.completed()
+    rows = iter_table_rows(args.input, sheet=args.sheet)
+    items = (item for item in iter_column(rows, args.column, has_header=not args.no_header)
+             if item[0] not in completed)
+    if completed:
+        print(f"Wznawianie partii: pominięto {len(completed)} ukończonych wierszy", file=sys.stderr)
+
+    # Limit dotyczy zapytań sieciowych; przy backendzie "process" procesy potomne dzielą jeden wspólny limiter
+    set_rate_limiter(RateLimiter(args.rate))
+
+    found = not_found = 0
+    started = time.monotonic()
+    metrics_start = METRICS.snapshot()
+    with ResultWriter(args.output) as writer:
+        # Plik wynikowy jest zapisywany od nowa - najpierw wyniki z dziennika
+        for _, record in journal.entries():
+            writer.write(record)
+
+        # Wyniki zapisywane są w kolejności ukończenia - numer wiersza wejściowego jest w kolumnie "Wiersz"
+        try:
+            for _, record in iter_batch(items, process_row, workers=args.workers, backend=args.backend):
+                writer.write(record)
+                if is_final_result(record["Link"]):
+                    journal.record(record["Wiersz"], record)
+                if record["Latitude"] is not None and record["Longitude"] is not None:
+                    found += 1
+                else:
+                    not_found += 1
+                done = found + not_found
+                if done % 50 == 0:
+                    print(f"Przetworzono {done} adresów ({time.monotonic() - started:.0f} s)", file=sys.stderr)
+        finally:
+            journal.close()
+
+    journal.discard()  # Partia zakończona - dziennik nie jest już potrzebny
+    if args.metrics_file:
+        write_textfile(args.metrics_file)
+    for stage, values in METRICS.summary_since(metrics_start)["stages"].items():
+        print(f"  {stage}: {values['count']} x {values['mean_s']:.3f} s", file=sys.stderr)
+    print(f"Gotowe: {found} znalezionych, {not_found} bez współrzędnych, "
+          f"czas {time.monotonic() - started:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# Importy wbudowane
+import os
+import csv
+import glob
+import time
+import atexit
+import tempfile
+import threading
+from array import array
+
+# Moduły aplikacji
+from spatial_index import EARTH_RADIUS_M
+from file_io import iter_table_rows, resolve_column
+
+# === KONFIGURACJA ===
+# Maksymalna liczba odległości liczonych naraz - pamięć robocza to kilka tablic float64 tej wielkości (~32 MB każda)
+BLOCK_ELEMENTS = int(os.environ.get("GEO_DISTANCE_BLOCK_ELEMENTS", 4_000_000))
+MATRIX_MAX_POINTS = int(os.environ.get("GEO_DISTANCE_MATRIX_MAX_POINTS", 2000))  # Limit punktów macierzy odległości (plik rośnie z kwadratem)
+MATRIX_FILE_PREFIX = "geo_matrix_"  # Prefiks plików tymczasowych z macierzą (do sprzątania starych plików)
+
+# Kolumny dopisywane do wyników przez przypisanie do najbliższego punktu
+SITE_COLUMN = "Najbliższy punkt"
+DISTANCE_COLUMN = "Odległość do punktu [m]"
+
+
+# === ODLEGŁOŚCI ===
+def iter_distance_blocks(lat, lon, other_lat=None, other_lon=None, block_elements=BLOCK_ELEMENTS):
+    """ Liczy macierz odległości haversine (w metrach) blokami wierszy i zwraca pary (pierwszy wiersz, blok).
+
+    Bez other_lat/other_lon liczone są odległości punktów między sobą. Blok ma najwyżej block_elements
+    komórek, więc pamięć nie rośnie z liczbą punktów; kolejne bloki nadpisują ten sam bufor.
+    """
+    import numpy as np
+    phi1 = np.radians(np.asarray(lat, dtype=np.float64))
+    lambda1 = np.radians(np.asarray(lon, dtype=np.float64))
+    if other_lat is None:
+        phi2, lambda2 = phi1, lambda1
+    else:
+        phi2 = np.radians(np.asarray(other_lat, dtype=np.float64))
+        lambda2 = np.radians(np.asarray(other_lon, dtype=np.float64))
+    cos_phi1, cos_phi2 = np.cos(phi1), np.cos(phi2)
+
+    rows = max(1, block_elements // max(1, len(phi2)))
+    buffer = np.empty((min(rows, len(phi1)), len(phi2)))
+    scratch = np.empty_like(buffer)
+    for start in range(0, len(phi1), rows):
+        stop = min(start + rows, len(phi1))
+        a, b = buffer[:stop - start], scratch[:stop - start]
+        # a = sin²(Δφ/2) + cos φ1 · cos φ2 · sin²(Δλ/2), liczone w miejscu bez tymczasowych macierzy
+        np.subtract(phi2, phi1[start:stop, None], out=a)
+        a *= 0.5
+        np.sin(a, out=a)
+        np.square(a, out=a)
+        np.subtract(lambda2, lambda1[start:stop, None], out=b)
+        b *= 0.5
+        np.sin(b, out=b)
+        np.square(b, out=b)
+        b *= cos_phi1[start:stop, None]
+        b *= cos_phi2
+        a += b
+        np.sqrt(a, out=a)
+        np.minimum(a, 1.0, out=a)
+        np.arcsin(a, out=a)
+        a *= 2 * EARTH_RADIUS_M
+        yield start, a
+
+def assign_nearest(lat, lon, site_lat, site_lon, block_elements=BLOCK_ELEMENTS):
+    """ Przypisuje każdy punkt do najbliższego z punktów site_* - zwraca (indeksy punktów, odległości w metrach). """
+    import numpy as np
+    if not len(site_lat):
+        raise ValueError("Brak punktów do przypisania")
+    nearest = np.empty(len(lat), dtype=np.intp)
+    distances = np.empty(len(lat), dtype=np.float64)
+    for start, block in iter_distance_blocks(lat, lon, site_lat, site_lon, block_elements):
+        stop = start + len(block)
+        nearest[start:stop] = block.argmin(axis=1)
+        distances[start:stop] = block[np.arange(len(block)), nearest[start:stop]]
+    return nearest, distances
+
+def assign_to_sites(results, sites, block_elements=BLOCK_ELEMENTS):
+    """ Dopisuje do wyników (ResultStore) kolumny z najbliższym punktem z sites i odległością do niego. """
+    names, site_lat, site_lon = sites
+    lat, lon = results.coordinates()
+    nearest, distances = assign_nearest(lat, lon, site_lat, site_lon, block_elements)
+    results.set_column(SITE_COLUMN, [names[index] for index in nearest.tolist()])
+    results.set_column(DISTANCE_COLUMN, distances.round(1).tolist())
+
+
+# === MACIERZ ODLEGŁOŚCI ===
+def write_distance_matrix(labels, lat, lon, path, block_elements=BLOCK_ELEMENTS):
+    """ Zapisuje macierz odległości między punktami do CSV blok po bloku (w pamięci jest jeden blok).
+
+    Odległości zaokrąglone są do pełnych metrów - zapis liczb całkowitych jest kilkukrotnie szybszy.
+    """
+    import numpy as np
+    with open(path, "w", encoding="utf-8-sig", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["", *labels])
+        for start, block in iter_distance_blocks(lat, lon, block_elements=block_elements):
+            for label, row in zip(labels[start:start + len(block)], block.round().astype(np.int64).tolist()):
+                writer.writerow([label, *row])
+
+_matrix_files = set()  # Pliki macierzy utworzone przez ten proces - usuwane przy jego zakończeniu
+_matrix_files_lock = threading.Lock()
+
+def distance_matrix_file(labels, lat, lon, block_elements=BLOCK_ELEMENTS):
+    """ Zapisuje macierz odległości do pliku tymczasowego i zwraca jego ścieżkę.
+
+    Plik usuwa wywołujący (remove_matrix_file); pozostałe pliki procesu są usuwane przy jego zakończeniu.
+    """
+    if len(labels) > MATRIX_MAX_POINTS:
+        raise ValueError(f"Macierz odległości jest dostępna dla najwyżej {MATRIX_MAX_POINTS} punktów")
+    handle, path = tempfile.mkstemp(prefix=MATRIX_FILE_PREFIX, suffix=".csv")
+    os.close(handle)
+    try:
+        write_distance_matrix(labels, lat, lon, path, block_elements)
+    except BaseException:
+        os.remove(path)
+        raise
+    with _matrix_files_lock:
+        _matrix_files.add(path)
+    return path
+
+def remove_matrix_file(path):
+    """ Usuwa plik macierzy (brak pliku nie jest błędem). """
+    with _matrix_files_lock:
+        _matrix_files.discard(path)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def remove_stale_matrix_files(max_age):
+    """ Usuwa pliki macierzy starsze niż max_age sekund (np. z sesji, które już się skończyły). """
+    removed = 0
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), f"{MATRIX_FILE_PREFIX}*.csv")):
+        try:
+            if time.time() - os.path.getmtime(path) > max_age:
+                remove_matrix_file(path)
+                removed += 1
+        except OSError:
+            pass  # Plik usunięty w międzyczasie przez inny proces
+    return removed
+
+@atexit.register
+def _remove_matrix_files():
+    for path in list(_matrix_files):
+        remove_matrix_file(path)
+
+
+# === PUNKTY (MAGAZYNY) ===
+def parse_coordinate(value):
+    """ Zamienia wartość komórki na liczbę (akceptuje przecinek dziesiętny); None dla pustych i błędnych. """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip().replace(",", "."))
+    except ValueError:
+        return None
+
+def read_sites(source, name_column, lat_column, lon_column, kind=None):
+    """ Wczytuje punkty (np. magazyny) z pliku CSV/XLSX - zwraca ((nazwy, lat, lon), liczba pominiętych wierszy). """
+    rows = iter_table_rows(source, kind=kind)
+    header = next(rows, None) or []
+    name_index, lat_index, lon_index = (resolve_column(header, column) for column in (name_column, lat_column, lon_column))
+
+    names, site_lat, site_lon = [], array('d'), array('d')
+    skipped = 0
+    for row in rows:
+        cells = [row[index] if index < len(row) else None for index in (name_index, lat_index, lon_index)]
+        if all(cell is None or not str(cell).strip() for cell in cells):
+            continue
+        latitude, longitude = parse_coordinate(cells[1]), parse_coordinate(cells[2])
+        if latitude is None or longitude is None or not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            skipped += 1
+            continue
+        names.append(str(cells[0] or "").strip() or f"{latitude}, {longitude}")
+        site_lat.append(latitude)
+        site_lon.append(longitude)
+    return (names, site_lat, site_lon), skipped
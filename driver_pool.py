@@ -0,0 +1,374 @@
+# Importy wbudowane
+import os
+import time
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+
+# Importy zewnętrzne
+import psutil
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Moduły aplikacji
+from metrics import METRICS
+from page_wait import wait_for_search_box, CONSENT
+
+# === KONFIGURACJA ===
+MAPS_URL = os.environ.get("GEO_MAPS_URL", "https://www.google.com/maps")  # Np. lokalny serwer-atrapa w benchmarkach
+POOL_SIZE = int(os.environ.get("GEO_POOL_SIZE", 2))  # Liczba ciepłych przeglądarek
+MAX_LOOKUPS = int(os.environ.get("GEO_POOL_MAX_LOOKUPS", 50))  # Po tylu wyszukiwaniach przeglądarka jest wymieniana
+MAX_RSS_MB = int(os.environ.get("GEO_POOL_MAX_RSS_MB", 800))  # Limit pamięci (RSS) całego drzewa procesów Chrome
+BROWSER_PROFILE = os.environ.get("GEO_BROWSER_PROFILE", "lean")  # "lean" albo "standard" (dotychczasowe ustawienia)
+TABS_PER_BROWSER = int(os.environ.get("GEO_POOL_TABS", 1))  # Liczba niezależnych kart (wyszukiwań) w jednej przeglądarce
+
+# Profil "lean": odczytujemy tylko adres URL i jeden element strony, więc kafelki mapy, obrazy,
+# czcionki i telemetria są blokowane, a okno jest małe
+LEAN_WINDOW_SIZE = "800,600"
+LEAN_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-gpu",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-domain-reliability",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication,CalculateNativeWinOcclusion",
+]
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+LEAN_BLOCKED_URLS = [
+    # Kafelki mapy i zdjęcia satelitarne / Street View
+    "*/maps/vt*", "*/kh/v=*", "*khms*.google.com*", "*streetviewpixels*", "*/maps/preview/pwa/*",
+    # Obrazy i czcionki
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*fonts.gstatic.com*", "*fonts.googleapis.com*",
+    # Telemetria
+    "*/gen_204*", "*/csi?*", "*play.google.com/log*", "*/maps/preview/log*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+]
+# Karty w tle muszą działać z pełną prędkością (bez dławienia timerów i renderowania)
+BACKGROUND_TAB_ARGUMENTS = [
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+# === FUNKCJE ===
+def get_chromedriver_path():
+    """ Zwraca ścieżkę do chromedrivera - instalacja odbywa się tylko raz na proces. """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+def create_driver(profile=BROWSER_PROFILE, tabs=1):
+    """ Uruchamia nową przeglądarkę Chrome w trybie headless (profil "lean" albo "standard"). """
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")  # Uruchomienie w tle (bez okna)
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if profile == "lean":
+        options.add_argument(f"--window-size={LEAN_WINDOW_SIZE}")
+        for argument in LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option("prefs", LEAN_PREFS)
+    if tabs > 1:
+        for argument in BACKGROUND_TAB_ARGUMENTS:
+            options.add_argument(argument)
+    driver = webdriver.Chrome(service=Service(get_chromedriver_path()), options=options)
+    try:
+        block_resources(driver, profile)
+    except Exception:
+        driver.quit()
+        raise
+    return driver
+
+def block_resources(driver, profile=BROWSER_PROFILE):
+    """ W profilu "lean" blokuje w bieżącej karcie zbędne zasoby (kafelki, czcionki, telemetria) przez DevTools. """
+    if profile == "lean":
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+
+def transferred_bytes(driver):
+    """ Zwraca liczbę bajtów pobranych przez bieżącą stronę (dokument i wszystkie zasoby). """
+    return driver.execute_script(
+        "return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))"
+        ".reduce((total, entry) => total + (entry.transferSize || 0), 0);") or 0
+
+def accept_cookies(driver, timeout=7):
+    """ Klika "Zaakceptuj wszystko", jeśli Google pokaże okno cookies. """
+    try:
+        accept_button = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable((By.XPATH, '//span[text()="Zaakceptuj wszystko"]')))
+        accept_button.click()
+        # Zamiast stałej pauzy czekamy, aż pole wyszukiwania będzie gotowe
+        WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.ID, "searchboxinput")))
+    except Exception:
+        pass  # Jeśli nie ma przycisku, idziemy dalej
+
+def process_tree_rss_mb(pid):
+    """ Zwraca łączne zużycie pamięci (RSS, MB) procesu i wszystkich jego potomków. """
+    try:
+        parent = psutil.Process(pid)
+        processes = [parent] + parent.children(recursive=True)
+    except psutil.Error:
+        return 0.0
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+def kill_orphaned_processes():
+    """ Zabija osierocone procesy chromedriver/chrome (przejęte przez init po śmierci rodzica). """
+    killed = 0
+    for process in psutil.process_iter(["name", "ppid", "cmdline"]):
+        try:
+            name = (process.info["name"] or "").lower()
+            if "chromedriver" not in name and not ("chrome" in name and "--headless" in (process.info["cmdline"] or [])):
+                continue
+            if process.info["ppid"] != 1:
+                continue
+            for child in process.children(recursive=True):
+                child.kill()
+            process.kill()
+            killed += 1
+        except psutil.Error:
+            pass
+    return killed
+
+
+# === PULA PRZEGLĄDAREK ===
+class PooledDriver:
+    """ Przeglądarka z puli wraz z licznikiem wykonanych wyszukiwań i jej kartami.
+
+    Sesja WebDrivera obsługuje jedną kartę naraz, więc polecenia kart są wykonywane pod wspólną blokadą
+    (BrowserTab.active); strony w pozostałych kartach ładują się w tym czasie równolegle.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.lookups = 0
+        self.pid = driver.service.process.pid
+        self.lock = threading.RLock()
+        self.current_handle = driver.current_window_handle
+        self.tabs = [BrowserTab(self, self.current_handle)]
+        self.in_use = 0  # Liczba wypożyczonych kart
+        self.retired = False  # Przeglądarka do zamknięcia po zwróceniu ostatniej karty
+
+    def open_tab(self, profile=BROWSER_PROFILE):
+        """ Otwiera nową kartę (z tymi samymi cookies) i zwraca ją jako BrowserTab. """
+        with self.lock:
+            self.driver.switch_to.new_window("tab")
+            self.current_handle = self.driver.current_window_handle
+            block_resources(self.driver, profile)
+            tab = BrowserTab(self, self.current_handle)
+            self.tabs.append(tab)
+            return tab
+
+    def rss_mb(self):
+        return process_tree_rss_mb(self.pid)
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        # Dobijamy procesy, które mogły przetrwać quit()
+        try:
+            parent = psutil.Process(self.pid)
+            for process in parent.children(recursive=True) + [parent]:
+                process.kill()
+        except psutil.Error:
+            pass
+
+
+class BrowserTab:
+    """ Jedna karta przeglądarki - niezależne pole wyszukiwania i adres URL dla jednego wyszukiwania naraz. """
+
+    def __init__(self, browser, handle):
+        self.browser = browser
+        self.handle = handle
+
+    @contextmanager
+    def active(self):
+        """ Przełącza sesję na tę kartę i zwraca sterownik; inne karty czekają do końca bloku. """
+        browser = self.browser
+        with browser.lock:
+            if browser.current_handle != self.handle:
+                browser.driver.switch_to.window(self.handle)
+                browser.current_handle = self.handle
+            yield browser.driver
+
+
+class DriverPool:
+    """ Pula długo żyjących przeglądarek z załadowanymi Mapami Google i zaakceptowanymi cookies.
+
+    Każda przeglądarka ma tabs kart, więc jednocześnie może trwać size * tabs wyszukiwań.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_lookups=MAX_LOOKUPS, max_rss_mb=MAX_RSS_MB, profile=BROWSER_PROFILE,
+                 tabs=TABS_PER_BROWSER):
+        self.size = size
+        self.max_lookups = max_lookups
+        self.max_rss_mb = max_rss_mb
+        self.profile = profile
+        self.tabs = max(1, tabs)
+        self._idle = []  # Bezczynne karty (LIFO - najcieplejsze na końcu)
+        self._created = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _load_maps(self, tab, consent=True):
+        """ Otwiera Mapy Google w karcie; consent=False dla kolejnych kart, które nie pokazują okna zgody. """
+        with tab.active() as driver:
+            with METRICS.timer("page_load"):
+                driver.get(MAPS_URL)
+            METRICS.count("page_load_bytes", transferred_bytes(driver))
+            if consent:
+                with METRICS.timer("cookie_consent"):
+                    accept_cookies(driver)
+                return
+        # Bez okna zgody czekamy tylko na pole wyszukiwania (sprawdzenia nie blokują innych kart przeglądarki)
+        if wait_for_search_box(tab) == CONSENT:
+            with tab.active() as driver:
+                accept_cookies(driver)
+
+    def _start(self):
+        """ Uruchamia przeglądarkę, otwiera Mapy Google w każdej karcie i akceptuje cookies. """
+        with METRICS.timer("driver_start"):
+            pooled = PooledDriver(create_driver(self.profile, self.tabs))
+        try:
+            self._load_maps(pooled.tabs[0])
+            for _ in range(self.tabs - 1):
+                # Cookies są wspólne dla przeglądarki - kolejne karty nie pokazują okna zgody
+                self._load_maps(pooled.open_tab(self.profile), consent=False)
+        except Exception:
+            pooled.quit()
+            raise
+        return pooled
+
+    def _needs_recycle(self, pooled):
+        if pooled.lookups >= self.max_lookups * self.tabs:
+            return True
+        return self.max_rss_mb > 0 and pooled.rss_mb() > self.max_rss_mb
+
+    def acquire(self, timeout=None):
+        """ Pobiera ciepłą kartę z puli (lub uruchamia nową przeglądarkę, jeśli jest miejsce). """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pula przeglądarek została zamknięta")
+                while self._idle:
+                    tab = self._idle.pop()
+                    if not tab.browser.retired:  # Karty zamkniętej przeglądarki pomijamy
+                        tab.browser.in_use += 1
+                        return tab
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._condition.wait(remaining)
+
+        try:
+            pooled = self._start()
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            pooled.in_use = 1
+            self._idle.extend(pooled.tabs[1:])
+            self._condition.notify_all()
+        return pooled.tabs[0]
+
+    def release(self, tab, broken=False):
+        """ Zwraca kartę do puli; uszkodzone lub "zużyte" przeglądarki są zamykane po zwolnieniu wszystkich kart. """
+        pooled = tab.browser
+        with self._condition:
+            pooled.lookups += 1
+        recycle = broken or self._closed or self._needs_recycle(pooled)
+        with self._condition:
+            pooled.in_use -= 1
+            if recycle:
+                pooled.retired = True
+            if not pooled.retired:
+                self._idle.append(tab)
+                self._condition.notify()
+                return
+            if pooled.in_use > 0:
+                return  # Pozostałe karty tej przeglądarki wciąż trwają - zamknie ją ostatnia
+            self._created -= 1
+            self._condition.notify()
+        pooled.quit()
+
+    @contextmanager
+    def tab(self, timeout=None):
+        """ Context manager wypożyczający kartę przeglądarki na czas jednego wyszukiwania. """
+        tab = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield tab
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.release(tab, broken=broken)
+
+    def close(self):
+        """ Zamyka wszystkie bezczynne przeglądarki i sprząta osierocone procesy. """
+        with self._condition:
+            self._closed = True
+            browsers = {id(tab.browser): tab.browser for tab in self._idle}.values()
+            idle = [pooled for pooled in browsers if pooled.in_use == 0 and not pooled.retired]
+            for pooled in idle:
+                pooled.retired = True
+                self._created -= 1
+            self._idle.clear()
+            self._condition.notify_all()
+        for pooled in idle:
+            pooled.quit()
+        kill_orphaned_processes()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """ Zwraca współdzieloną pulę przeglądarek (jedna na proces). """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            kill_orphaned_processes()  # Sprzątamy po poprzednim, nieczysto zakończonym procesie
+            _pool = DriverPool()
+            atexit.register(_pool.close)
+        return _pool
+
+def set_pool(pool):
+    """ Podmienia współdzieloną pulę (np. w benchmarkach porównujących profile przeglądarki). """
+    global _pool
+    with _pool_lock:
+        _pool = pool
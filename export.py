@@ -0,0 +1,112 @@
+# Importy wbudowane
+import os
+import csv
+import json
+import tempfile
+from itertools import islice
+
+# === KONFIGURACJA ===
+EXPORT_COLUMNS = ["Adres", "Wyszukany adres", "Latitude", "Longitude", "Link"]
+PARQUET_BATCH_SIZE = 50000  # Liczba wierszy w jednej grupie (row group) pliku Parquet
+
+# Format -> (etykieta, typ MIME, rozszerzenie pliku)
+EXPORT_FORMATS = {
+    "xlsx": ("Excel (XLSX)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "csv": ("CSV", "text/csv", "csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", "parquet"),
+    "geojson": ("GeoJSON", "application/geo+json", "geojson"),
+}
+
+
+# === ZAPIS W FORMATACH ===
+def write_xlsx(records, path, columns=EXPORT_COLUMNS):
+    """ Zapisuje wyniki do XLSX w trybie stałej pamięci (wiersze trafiają od razu do pliku tymczasowego). """
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        worksheet = workbook.add_worksheet("Wspolrzedne_geograficzne")
+        coordinate_format = workbook.add_format({"num_format": "0.00000000"})
+        worksheet.write_row(0, 0, columns)
+        for row, record in enumerate(records, start=1):
+            for col, column in enumerate(columns):
+                value = record.get(column)
+                if value is None:
+                    continue
+                if column in ("Latitude", "Longitude"):
+                    worksheet.write_number(row, col, float(value), coordinate_format)
+                else:
+                    worksheet.write(row, col, value)
+    finally:
+        workbook.close()
+
+def write_csv(records, path, columns=EXPORT_COLUMNS):
+    """ Zapisuje wyniki do CSV wiersz po wierszu. """
+    with open(path, "w", encoding="utf-8-sig", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow([record.get(column) for column in columns])
+
+def write_parquet(records, path, columns=EXPORT_COLUMNS):
+    """ Zapisuje wyniki do Parquet partiami (kolumny liczbowe jako float64, pozostałe jako tekst). """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    records = iter(records)
+    batch = list(islice(records, PARQUET_BATCH_SIZE))
+    # Kolumny liczbowe (współrzędne, odległości) jako float64, pozostałe jako tekst - typy według pierwszego wiersza
+    first = batch[0] if batch else {}
+    schema = pa.schema([
+        (column, pa.float64() if column in ("Latitude", "Longitude") or isinstance(first.get(column), float)
+         else pa.string()) for column in columns
+    ])
+    with pq.ParquetWriter(path, schema) as writer:
+        while batch:
+            arrays = {column: [record.get(column) for record in batch] for column in columns}
+            writer.write_table(pa.table(arrays, schema=schema))
+            batch = list(islice(records, PARQUET_BATCH_SIZE))
+
+def write_geojson(records, path, columns=EXPORT_COLUMNS):
+    """ Zapisuje wyniki jako GeoJSON FeatureCollection (punkty), obiekt po obiekcie. """
+    properties = [column for column in columns if column not in ("Latitude", "Longitude")]
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write('{"type": "FeatureCollection", "features": [\n')
+        first = True
+        for record in records:
+            if record.get("Latitude") is None or record.get("Longitude") is None:
+                continue
+            feature = {
+                "type": "Feature",
+                # GeoJSON: kolejność [długość, szerokość]
+                "geometry": {"type": "Point", "coordinates": [float(record["Longitude"]), float(record["Latitude"])]},
+                "properties": {column: record.get(column) for column in properties},
+            }
+            handle.write(("" if first else ",\n") + json.dumps(feature, ensure_ascii=False))
+            first = False
+        handle.write("\n]}\n")
+
+WRITERS = {
+    "xlsx": write_xlsx,
+    "csv": write_csv,
+    "parquet": write_parquet,
+    "geojson": write_geojson,
+}
+
+
+# === FUNKCJE ===
+def export_records(records, fmt, path, columns=EXPORT_COLUMNS):
+    """ Zapisuje wyniki w wybranym formacie do pliku. """
+    if fmt not in WRITERS:
+        raise ValueError(f"Nieobsługiwany format eksportu: {fmt}")
+    WRITERS[fmt](records, path, columns)
+
+def export_bytes(records, fmt, columns=EXPORT_COLUMNS):
+    """ Zwraca zawartość pliku eksportu - zapis idzie strumieniowo na dysk, w pamięci jest tylko gotowy plik. """
+    handle, path = tempfile.mkstemp(suffix=f".{EXPORT_FORMATS[fmt][2]}")
+    os.close(handle)
+    try:
+        export_records(records, fmt, path, columns)
+        with open(path, "rb") as result:
+            return result.read()
+    finally:
+        os.remove(path)
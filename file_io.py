@@ -0,0 +1,147 @@
+# Importy wbudowane
+import io
+import os
+import csv
+from itertools import islice
+
+# === KONFIGURACJA ===
+RESULT_COLUMNS = ["Wiersz", "Adres", "Wyszukany adres", "Latitude", "Longitude", "Link"]
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+CSV_DELIMITERS = ",;\t"
+
+
+class SingleColumn(csv.excel):
+    """ Plik CSV z jedną kolumną - wiersz nie jest dzielony (separator to znak, który nie występuje w tekście). """
+    delimiter = "\x1f"
+
+
+# === ODCZYT ===
+def table_kind(name):
+    """ Rozpoznaje typ pliku po rozszerzeniu: "xlsx" albo "csv". """
+    return "xlsx" if os.path.splitext(name)[1].lower() in EXCEL_EXTENSIONS else "csv"
+
+def iter_table_rows(source, kind=None, sheet=None):
+    """ Strumieniowo zwraca wiersze (listy wartości) z pliku CSV/XLSX - bez wczytywania całego pliku.
+
+    source to ścieżka albo binarny obiekt plikowy (np. plik przesłany w Streamlit).
+    """
+    if kind is None:
+        kind = table_kind(source if isinstance(source, str) else getattr(source, "name", ""))
+
+    if kind == "xlsx":
+        from openpyxl import load_workbook
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+            for row in worksheet.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+        return
+
+    handle = open(source, "rb") if isinstance(source, str) else source
+    text = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+    try:
+        # Rozpoznanie separatora (",", ";" lub tabulator) na podstawie początku pliku - tylko spośród znaków
+        # z nagłówka, bo przy jednej kolumnie przecinki w adresach ("ul. Kwiatowa 1, Warszawa") nie są separatorem
+        sample = text.read(4096)
+        text.seek(0)
+        header = sample.splitlines()[0] if sample else ""
+        delimiters = "".join(delimiter for delimiter in CSV_DELIMITERS if delimiter in header)
+        if not delimiters:
+            dialect = SingleColumn
+        else:
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=delimiters)
+            except csv.Error:
+                dialect = type("Delimited", (csv.excel,), {"delimiter": delimiters[0]})
+        for row in csv.reader(text, dialect):
+            yield row
+    finally:
+        text.detach()
+        if isinstance(source, str):
+            handle.close()
+
+def read_header(source, kind=None, sheet=None):
+    """ Zwraca pierwszy wiersz pliku (nagłówek) jako listę nazw kolumn. """
+    rows = iter_table_rows(source, kind=kind, sheet=sheet)
+    try:
+        header = next(rows, None) or []
+    finally:
+        rows.close()
+    return [str(name).strip() if name is not None else "" for name in header]
+
+def iter_chunks(iterable, size):
+    """ Dzieli strumień na listy po maksymalnie size elementów. """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def resolve_column(header, column):
+    """ Zwraca indeks kolumny podanej nazwą albo numerem (od 1); bez podania - pierwsza kolumna. """
+    if column is None:
+        return 0
+    if header is not None:
+        names = [str(name).strip() if name is not None else "" for name in header]
+        if str(column) in names:
+            return names.index(str(column))
+    if str(column).isdigit() and int(column) >= 1:
+        return int(column) - 1
+    raise ValueError(f"Nie znaleziono kolumny: {column}")
+
+def iter_column(rows, column=None, has_header=True):
+    """ Zwraca pary (numer wiersza w pliku, tekst z wybranej kolumny), pomijając puste komórki. """
+    rows = iter(rows)
+    header = next(rows, None) if has_header else None
+    index = resolve_column(header, column)
+    start = 2 if has_header else 1
+    for row_number, row in enumerate(rows, start=start):
+        value = row[index] if index < len(row) else None
+        if value is None or not str(value).strip():
+            continue
+        yield row_number, str(value).strip()
+
+
+# === ZAPIS ===
+class ResultWriter:
+    """ Przyrostowy zapis wyników do CSV lub XLSX (tryb stałej pamięci) - wiersz po wierszu. """
+
+    def __init__(self, path, columns=RESULT_COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.kind = table_kind(path)
+        if self.kind == "xlsx":
+            import xlsxwriter
+            self._workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+            self._sheet = self._workbook.add_worksheet("Wspolrzedne_geograficzne")
+            self._sheet.write_row(0, 0, columns)
+            self._row = 1
+        else:
+            self._file = open(path, "w", encoding="utf-8-sig", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(columns)
+
+    def write(self, record):
+        """ Dopisuje jeden rekord (słownik z kluczami jak w columns). """
+        values = [record.get(column) for column in self.columns]
+        if self.kind == "xlsx":
+            self._sheet.write_row(self._row, 0, ["" if value is None else value for value in values])
+            self._row += 1
+        else:
+            self._writer.writerow(values)
+            self._file.flush()  # Wynik jest na dysku od razu po zakończeniu wyszukiwania
+
+    def close(self):
+        if self.kind == "xlsx":
+            self._workbook.close()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
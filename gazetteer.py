@@ -0,0 +1,116 @@
+# Importy wbudowane
+import os
+import re
+import bisect
+import threading
+from array import array
+
+# Moduły aplikacji
+from address_normalizer import address_key
+from file_io import iter_table_rows
+
+# === KONFIGURACJA ===
+GAZETTEER_PATH = os.environ.get("GEO_GAZETTEER_PATH", "")  # Plik CSV/XLSX ze spisem adresów (pusty = wyłączony)
+
+# Dopuszczalne nazwy kolumn pliku (w tym eksport OSM z tagami addr:*)
+COLUMN_NAMES = {
+    "street": ("street", "ulica", "addr:street"),
+    "number": ("housenumber", "house_number", "numer", "addr:housenumber"),
+    "city": ("city", "miasto", "miejscowosc", "miejscowość", "addr:city", "addr:place"),
+    "postcode": ("postcode", "kod", "kod_pocztowy", "addr:postcode"),
+    "lat": ("lat", "latitude", "y"),
+    "lon": ("lon", "lng", "longitude", "x"),
+}
+
+
+# === FUNKCJE ===
+def gazetteer_key(text):
+    """ Zwraca klucz indeksu: adres kanoniczny bez "ul.", kodu pocztowego, numeru lokalu i przecinków. """
+    key = address_key(text)
+    key = re.sub(r'(?<!\w)ul\. ', '', key)
+    key = re.sub(r'\b\d{2}-\d{3}\b', ' ', key)  # Kod pocztowy
+    key = re.sub(r'(\d+[a-z]?)\s*/\s*\d+\w*', r'\1', key)  # Numer lokalu "5/12" -> "5"
+    key = key.replace(',', ' ')
+    return re.sub(r'\s+', ' ', key).strip()
+
+def _column_indexes(header):
+    """ Dopasowuje kolumny pliku do pól spisu adresów. """
+    names = [str(name).strip().lower() if name is not None else "" for name in header]
+    indexes = {}
+    for field, candidates in COLUMN_NAMES.items():
+        for candidate in candidates:
+            if candidate in names:
+                indexes[field] = names.index(candidate)
+                break
+    missing = {"street", "number", "city", "lat", "lon"} - set(indexes)
+    if missing:
+        raise ValueError(f"Brak kolumn w spisie adresów: {', '.join(sorted(missing))}")
+    return indexes
+
+
+# === INDEKS ===
+class Gazetteer:
+    """ Lokalny spis adresów w zwartym indeksie: posortowane klucze (wyszukiwanie binarne)
+    oraz tablice float64 ze współrzędnymi. """
+
+    def __init__(self, entries):
+        entries = sorted(entries)
+        self._keys = [entry[0] for entry in entries]
+        self._names = [entry[1] for entry in entries]
+        self._lat = array('d', (entry[2] for entry in entries))
+        self._lon = array('d', (entry[3] for entry in entries))
+
+    @classmethod
+    def load(cls, path):
+        """ Wczytuje spis adresów z pliku CSV/XLSX (ulica, numer, miejscowość, [kod], lat, lon). """
+        rows = iter_table_rows(path)
+        indexes = _column_indexes(next(rows, []))
+        entries = {}
+        for row in rows:
+            try:
+                street, number, city = (str(row[indexes[field]]).strip() for field in ("street", "number", "city"))
+                latitude, longitude = float(row[indexes["lat"]]), float(row[indexes["lon"]])
+            except (IndexError, TypeError, ValueError):
+                continue  # Niepełny wiersz
+            if not street or not number or not city:
+                continue
+            postcode = str(row[indexes["postcode"]]).strip() if "postcode" in indexes and row[indexes["postcode"]] else ""
+            name = f"{street} {number}, {postcode + ' ' if postcode else ''}{city}"
+            entries.setdefault(gazetteer_key(f"{street} {number} {city}"), (name, latitude, longitude))
+        return cls((key, *value) for key, value in entries.items())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _record(self, position):
+        return {
+            "Wyszukany adres": self._names[position],
+            "Latitude": self._lat[position],
+            "Longitude": self._lon[position],
+        }
+
+    def lookup(self, address):
+        """ Zwraca rekord ("Wyszukany adres", Latitude, Longitude) dla adresu albo None, gdy go nie ma w spisie. """
+        key = gazetteer_key(address)
+        position = bisect.bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            return self._record(position)
+        return None
+
+    def iter_points(self):
+        """ Zwraca (wyszukany adres, lat, lon) dla wszystkich adresów ze spisu (np. do indeksu przestrzennego). """
+        return zip(self._names, self._lat, self._lon)
+
+
+_gazetteer = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer():
+    """ Zwraca współdzielony spis adresów (wczytany raz na proces) albo None, gdy nie skonfigurowano pliku. """
+    global _gazetteer, _gazetteer_loaded
+    with _gazetteer_lock:
+        if not _gazetteer_loaded:
+            _gazetteer = Gazetteer.load(GAZETTEER_PATH) if GAZETTEER_PATH else None
+            _gazetteer_loaded = True
+        return _gazetteer
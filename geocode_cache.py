@@ -0,0 +1,156 @@
+# Importy wbudowane
+import os
+import time
+import sqlite3
+import threading
+
+# Moduły aplikacji
+from address_normalizer import address_key
+
+# === KONFIGURACJA ===
+CACHE_PATH = os.environ.get("GEO_CACHE_PATH", "geocode_cache.sqlite3")  # Plik bazy SQLite z cache
+CACHE_TTL = float(os.environ.get("GEO_CACHE_TTL", 30 * 24 * 3600))  # Czas życia wpisu w sekundach (0 = bez limitu)
+CACHE_MAX_ENTRIES = int(os.environ.get("GEO_CACHE_MAX_ENTRIES", 100000))  # Maksymalna liczba wpisów (0 = bez limitu)
+
+
+# === FUNKCJE ===
+def normalize_key(address):
+    """ Zwraca klucz cache dla adresu (postać kanoniczna, patrz address_normalizer). """
+    return address_key(address)
+
+
+# === CACHE ===
+class GeocodeCache:
+    """ Trwały cache wyników wyszukiwania (link, współrzędne, wyszukany adres) w bazie SQLite. """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")  # Odczyty nie blokują zapisów z innych procesów
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geocode (
+                key TEXT PRIMARY KEY,
+                map_link TEXT NOT NULL,
+                search_name TEXT,
+                lat REAL,
+                lon REAL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS geocode_accessed ON geocode (accessed_at)")
+        # Adres w pisowni z wejścia (do wyświetlania) - kolumna dodawana do baz utworzonych bez niej
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(geocode)")}
+        if "address" not in columns:
+            self._conn.execute("ALTER TABLE geocode ADD COLUMN address TEXT")
+
+        # Przeterminowane wpisy usuwamy przy starcie; dalej liczba wpisów jest śledzona bez COUNT(*) przy każdym zapisie
+        self._size = 0
+        self.purge_expired()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+    def get(self, address):
+        """ Zwraca słownik z zapisanym wynikiem albo None (brak lub wpis przeterminowany). """
+        key = normalize_key(address)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT map_link, search_name, lat, lon, created_at FROM geocode WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl and now - row[4] > self.ttl):
+                if row is not None:
+                    self._conn.execute("DELETE FROM geocode WHERE key = ?", (key,))
+                    self._size -= 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE geocode SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return {"map_link": row[0], "search_name": row[1], "lat": row[2], "lon": row[3]}
+
+    def put(self, address, map_link, search_name, lat, lon):
+        """ Zapisuje wynik wyszukiwania; po przekroczeniu limitu usuwa przeterminowane i najdawniej używane wpisy. """
+        key = normalize_key(address)
+        now = time.time()
+        with self._lock:
+            new = self._conn.execute("SELECT 1 FROM geocode WHERE key = ?", (key,)).fetchone() is None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (key, address, map_link, search_name, lat, lon, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, address.strip(), map_link, search_name, lat, lon, now, now),
+            )
+            self._size += new
+            if self.max_entries and self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """ Usuwa przeterminowane wpisy, a jeśli to nie wystarczy - najdawniej używane (wywoływane pod blokadą). """
+        if self.ttl:
+            self._conn.execute("DELETE FROM geocode WHERE created_at < ?", (time.time() - self.ttl,))
+        # Liczba wpisów liczona od nowa tylko tutaj - do tej samej bazy mogą pisać też inne procesy
+        self._size = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+        if self._size > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM geocode WHERE key IN (SELECT key FROM geocode ORDER BY accessed_at LIMIT ?)",
+                (self._size - self.max_entries,),
+            )
+            self._size = self.max_entries
+
+    def iter_points(self):
+        """ Zwraca (klucz adresu, adres, wyszukany adres, lat, lon) dla wszystkich zapisanych punktów.
+
+        Wpisy zapisane przed dodaniem kolumny z adresem mają w jej miejscu klucz.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, COALESCE(address, key), search_name, lat, lon FROM geocode "
+                "WHERE lat IS NOT NULL AND lon IS NOT NULL"
+            ).fetchall()
+        return rows
+
+    def purge_expired(self):
+        """ Usuwa wszystkie przeterminowane wpisy (przy starcie i przy przekroczeniu limitu wpisów). """
+        if not self.ttl:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM geocode WHERE created_at < ?", (time.time() - self.ttl,))
+            self._size = max(0, self._size - cursor.rowcount)
+        return cursor.rowcount
+
+    def stats(self):
+        """ Zwraca liczniki trafień/chybień oraz liczbę wpisów w cache. """
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """ Zwraca współdzielony cache (jeden na proces). """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = GeocodeCache()
+        return _cache
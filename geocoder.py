@@ -0,0 +1,222 @@
+# Importy wbudowane
+import re
+import time
+import threading
+
+# Moduły aplikacji (Selenium i pula przeglądarek ładowane są dopiero w get_google_maps_link)
+from geocode_cache import get_cache
+from resolvers import (HttpResolver, SeleniumResolver, ChainResolver, check_search_name, place_link, RESOLVERS,
+                       PIN_PATTERN, NO_EXACT_ADDRESS)
+from gazetteer import get_gazetteer
+from spatial_index import index_point
+from metrics import METRICS, classify_outcome
+from resilience import LookupFailure, classify_exception, retry, get_breaker, NO_RESULT, BLOCKED
+from batch import get_rate_limiter
+
+MAPS_BASE_URL = "https://www.google.com"
+# Środek widoku mapy w linku: @<lat>,<lon> (dokładna pinezka miejsca to PIN_PATTERN: !3d<lat>!4d<lon>)
+VIEWPORT_PATTERN = re.compile(r'@(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)')
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+# === FUNKCJE ===
+def get_google_maps_link(address):
+    """ Pobiera link do Google Maps na podstawie wpisanego adresu oraz wyciąga poprawny adres wyszukany przez Google Maps.
+
+    Błędy są zgłaszane jako LookupFailure z rodzajem błędu (ponawianie i wyłącznik obsługuje lookup_address).
+    """
+    # Selenium do automatyzacji przeglądarki
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from driver_pool import get_pool
+    from page_wait import wait_for_result, wait_for_search_box, address_element_ids, SEARCH_BOX_ID, FOUND, TIMEOUT, CONSENT
+
+    failure = None
+    try:
+        # Ciepła karta przeglądarki z puli - Mapy są już załadowane, a cookies zaakceptowane.
+        # Polecenia wykonujemy w kontekście karty (tab.active), więc kilka wyszukiwań może trwać w jednej przeglądarce.
+        with get_pool().tab() as tab:
+            try:
+                with METRICS.timer("search_submit"):
+                    # Pole wyszukiwania może być zasłonięte przez okno zgody albo CAPTCHA
+                    obstacle = wait_for_search_box(tab)
+                    if obstacle is not None:
+                        raise LookupFailure(obstacle)
+
+                    with tab.active() as driver:
+                        # Stan strony sprzed wyszukiwania (karta może pokazywać poprzedni wynik)
+                        previous_url = driver.current_url
+                        previous_ids = address_element_ids(driver)
+
+                        # Wpisanie adresu w pole wyszukiwania
+                        search_box = driver.find_element(By.ID, SEARCH_BOX_ID)
+                        search_box.clear()
+                        search_box.send_keys(address)
+                        search_box.send_keys(Keys.RETURN)
+
+                # Czekamy tylko tyle, ile trzeba na link ze współrzędnymi i adres z wyniku
+                result = wait_for_result(tab, previous_url, previous_ids)
+                if result.url_seconds is not None:
+                    METRICS.observe("url_settle", result.url_seconds)
+                if result.address_seconds is not None:
+                    METRICS.observe("address_extraction", result.address_seconds)
+                METRICS.count(f"settle_{result.status}")
+                if result.status in (TIMEOUT, CONSENT, BLOCKED):
+                    raise LookupFailure(result.status)
+            except LookupFailure as e:
+                failure = e
+            except Exception as e:
+                failure = classify_exception(e)
+                failure.__cause__ = e
+            # Przeglądarka jest zamykana przez pulę tylko po zgodzie, blokadzie lub awarii (nowa ma świeżą sesję
+            # i cookies) - po przekroczeniu czasu karta wraca do puli
+            if failure is not None and failure.recycles_browser:
+                raise failure
+
+    except LookupFailure:
+        raise
+    except Exception as e:
+        raise classify_exception(e) from e
+
+    if failure is not None:
+        raise failure
+
+    if result.status == NO_RESULT:
+        raise LookupFailure(NO_RESULT)
+
+    # Pobieranie linku do mapy
+    map_link = result.url
+
+    # Wyciąganie adresu z wyników wyszukiwania (element <span class="DkEaL">)
+    if result.status == FOUND:
+        # Sprawdzanie, czy wynik jest zbyt ogólny
+        search_name = check_search_name(result.address)
+    else:
+        search_name = NO_EXACT_ADDRESS
+
+    return map_link, search_name
+
+def get_resolver():
+    """ Zwraca współdzielony łańcuch backendów wyszukiwania w kolejności z GEO_RESOLVERS. """
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            backends = {
+                "http": HttpResolver,
+                "selenium": lambda: SeleniumResolver(get_google_maps_link),
+            }
+            names = [name.strip() for name in RESOLVERS.split(",") if name.strip()]
+            _resolver = ChainResolver(backends[name]() for name in names)
+        return _resolver
+
+def set_resolver(resolver):
+    """ Podmienia łańcuch backendów wyszukiwania (np. w benchmarkach na atrapie Map Google). """
+    global _resolver
+    with _resolver_lock:
+        _resolver = resolver
+
+def lookup_address(address):
+    """ Zwraca (link, wyszukany adres) z lokalnego spisu adresów lub trwałego cache, a przy braku wpisu - z backendów wyszukiwania. """
+    started = time.perf_counter()
+    map_link, search_name = _lookup_address(address)
+    METRICS.observe("lookup_total", time.perf_counter() - started)
+    latitude, longitude = extract_coordinates(map_link)
+    METRICS.count(classify_outcome(map_link, search_name, bool(latitude and longitude)))
+    return map_link, search_name
+
+def _lookup_address(address):
+    # Znane adresy z lokalnego spisu - bez sieci i przeglądarki
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        record = gazetteer.lookup(address)
+        if record is not None:
+            METRICS.count("gazetteer_hit")
+            # Punkt jest już w indeksie przestrzennym - indeks zawiera cały spis adresów
+            map_link = place_link(MAPS_BASE_URL, record["Wyszukany adres"], record["Latitude"], record["Longitude"])
+            return map_link, record["Wyszukany adres"]
+
+    cache = get_cache()
+    cached = cache.get(address)
+    if cached is not None:
+        METRICS.count("cache_hit")
+        return cached["map_link"], cached["search_name"]
+
+    # Najpierw szybki backend HTTP, przeglądarka tylko dla zapytań, których on nie rozstrzygnie.
+    # Przejściowe błędy są ponawiane, a przy serii blokad wyłącznik wstrzymuje wszystkie wyszukiwania.
+    try:
+        result = retry(lambda: _resolve(address))
+    except LookupFailure as failure:
+        METRICS.count(f"failure_{failure.kind}")
+        if failure.kind == NO_RESULT:
+            return "Brak wyników", "Google Maps nie znalazły adresu"
+        return f"Błąd: {failure}", failure.label
+    if result is None:
+        return "Brak wyników", "Google Maps nie znalazły adresu"
+    map_link, search_name = result
+    latitude, longitude = extract_coordinates(map_link)
+    # Zapamiętujemy tylko udane wyszukiwania z adresem (wynik bez adresu sprawdzamy przy kolejnym wyszukiwaniu)
+    if latitude and longitude and search_name != NO_EXACT_ADDRESS:
+        cache.put(address, map_link, search_name, latitude, longitude)
+        index_point(address, search_name, latitude, longitude)
+    return map_link, search_name
+
+def _resolve(address):
+    """ Jedna próba wyszukiwania przez backendy; wynik (blokada lub nie) trafia do wyłącznika.
+
+    Globalny limit zapytań dotyczy tylko tej ścieżki - trafienia w cache i spisie adresów nie czekają.
+    """
+    breaker = get_breaker()
+    breaker.before_call()
+    get_rate_limiter().wait()
+    try:
+        result = get_resolver().resolve(address)
+    except LookupFailure as failure:
+        breaker.record(failure.kind == BLOCKED)
+        raise
+    except Exception as e:
+        breaker.record(False)
+        raise classify_exception(e) from e
+    breaker.record(False)
+    return result
+
+def extract_coordinates(map_link):
+    """ Wyciąga współrzędne geograficzne z linku Google Maps.
+
+    Pierwszeństwo ma pinezka miejsca (!3d<lat>!4d<lon>), a "@lat,lon" (środek widoku mapy) jest używane tylko bez niej.
+    """
+    match = PIN_PATTERN.search(map_link) or VIEWPORT_PATTERN.search(map_link)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    return None, None
+
+def extract_coordinates_batch(map_links):
+    """ Wyciąga współrzędne z całej kolumny linków jednym wektorowym przebiegiem (pandas .str.extract).
+
+    Zwraca DataFrame z kolumnami Latitude i Longitude (float64, NaN przy braku współrzędnych)
+    o indeksie jak wejściowa seria; pierwszeństwo ma pinezka miejsca, jak w extract_coordinates.
+    """
+    import pandas as pd
+    links = map_links if isinstance(map_links, pd.Series) else pd.Series(list(map_links), dtype=object)
+    pin = links.str.extract(PIN_PATTERN)
+    viewport = links.str.extract(VIEWPORT_PATTERN)
+    # Obie grupy wzorca występują zawsze razem, więc uzupełnianie komórek nie miesza par współrzędnych
+    coordinates = pin.combine_first(viewport).astype("float64")
+    coordinates.columns = ["Latitude", "Longitude"]
+    return coordinates
+
+def is_valid_address(address):
+    """ Sprawdza, czy adres zawiera przynajmniej jedną literę (aby uniknąć wpisywania samych cyfr). """
+    return bool(re.search(r'[a-zA-ZąćęłńóśźżĄĆĘŁŃÓŚŹŻ]', address))
+
+def geocode_address(address):
+    """ Wyszukuje adres i zwraca rekord w formacie wiersza tabeli wyników (współrzędne None, gdy brak). """
+    result_link, search_name = lookup_address(address)
+    latitude, longitude = extract_coordinates(result_link)
+    return {
+        "Adres": address,
+        "Wyszukany adres": search_name,
+        "Latitude": latitude,
+        "Longitude": longitude,
+        "Link": result_link
+    }
@@ -0,0 +1,210 @@
+# Importy wbudowane
+import os
+import time
+import threading
+from collections import deque
+
+# Moduły aplikacji
+from address_normalizer import deduplicate_addresses
+from batch import BATCH_WORKERS
+from journal import job_id, job_journal, is_final_result
+from metrics import METRICS, Metrics
+from result_store import ResultStore
+
+# === KONFIGURACJA ===
+JOB_TTL = float(os.environ.get("GEO_JOB_TTL", 3600))  # Jak długo (s) trzymać wyniki zakończonego zadania
+
+# Stany zadania
+QUEUED = "queued"        # Czeka na wolnego workera
+RUNNING = "running"      # Wyszukiwania w toku
+DONE = "done"            # Wszystkie adresy wyszukane
+CANCELLED = "cancelled"  # Przerwane przez użytkownika (wyniki częściowe zostają)
+
+
+# === ZADANIE ===
+class Job:
+    """ Partia adresów wyszukiwana w tle - stan i wyniki częściowe odpytywane przez interfejs.
+
+    Duplikaty adresów wyszukiwane są raz; found[i] to (wyszukany adres, lat, lon, link) dla unikalnego
+    adresu i, gdy wynik ma współrzędne.
+    """
+
+    def __init__(self, addresses):
+        self.id = job_id(addresses)
+        self.addresses = list(addresses)
+        self.unique, self.row_to_unique = deduplicate_addresses(self.addresses)
+        self.results = [None] * len(self.unique)  # (link, wyszukany adres) po zakończeniu wyszukiwania
+        self.found = [None] * len(self.unique)
+        self.completed = 0
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.metrics = Metrics()  # Czasy etapów i liczniki tylko z wyszukiwań tego zadania
+        self._pending = []  # Indeksy unikalnych adresów do wyszukania
+        self._next = 0  # Pozycja następnego zadania w _pending
+        self._in_flight = 0
+        self._journal = job_journal(self.unique)
+
+    @property
+    def total(self):
+        return len(self.unique)
+
+    @property
+    def is_finished(self):
+        return self.status in (DONE, CANCELLED)
+
+    def _has_tasks(self):
+        return self.status in (QUEUED, RUNNING) and self._next < len(self._pending)
+
+    def _set_result(self, index, result):
+        from geocoder import extract_coordinates
+        map_link, search_name = result
+        latitude, longitude = extract_coordinates(map_link)
+        if latitude and longitude:
+            self.found[index] = (search_name, latitude, longitude, map_link)
+        self.results[index] = result
+        self.completed += 1
+
+    def result_store(self):
+        """ Zwraca dotychczas znalezione wyniki w kolejności adresów wejściowych. """
+        store = ResultStore()
+        for address, unique_index in zip(self.addresses, self.row_to_unique):
+            found = self.found[unique_index]
+            if found is not None:
+                store.append(address, *found)
+        return store
+
+    def failures(self):
+        """ Zwraca (adres, wyszukany adres, link) dla wierszy wyszukanych bez współrzędnych. """
+        failed = []
+        for address, unique_index in zip(self.addresses, self.row_to_unique):
+            result = self.results[unique_index]
+            if result is not None and self.found[unique_index] is None:
+                failed.append((address, result[1], result[0]))
+        return failed
+
+
+# === USŁUGA ===
+class JobService:
+    """ Usługa zadań w tle wspólna dla wszystkich sesji - jedna ograniczona grupa workerów.
+
+    Zadania nie zależą od przebiegu skryptu Streamlit (odświeżenie strony ich nie przerywa), ta sama
+    lista adresów trafia do tego samego zadania, a workerzy biorą adresy z aktywnych zadań na zmianę.
+    """
+
+    def __init__(self, lookup, workers=BATCH_WORKERS, ttl=JOB_TTL):
+        self.lookup = lookup
+        self.workers = max(1, int(workers))
+        self.ttl = ttl
+        self._jobs = {}
+        self._queue = deque()  # Zadania z adresami do wyszukania (kolejka cykliczna)
+        self._threads = []
+        self._condition = threading.Condition()
+
+    def submit(self, addresses):
+        """ Przyjmuje partię adresów i zwraca jej zadanie (istniejące, jeśli ta sama partia już trwa). """
+        with self._condition:
+            self._expire()
+            existing = self._jobs.get(job_id(addresses))
+            if existing is not None and existing.status != CANCELLED:
+                return existing
+
+            job = Job(addresses)
+
+            # Wyniki zapisane w dzienniku (np. przed restartem serwera) nie są wyszukiwane ponownie
+            done = dict(job._journal.entries())
+            for index, address in enumerate(job.unique):
+                if address in done:
+                    job._set_result(index, tuple(done[address]))
+                else:
+                    job._pending.append(index)
+            self._jobs[job.id] = job
+            if job._pending:
+                self._queue.append(job)
+                self._start_workers()
+                self._condition.notify_all()
+            else:
+                self._finish(job, DONE)
+            return job
+
+    def get(self, job_id):
+        """ Zwraca zadanie o podanym identyfikatorze albo None (nieznane lub wygasłe). """
+        with self._condition:
+            self._expire()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """ Przerywa zadanie - trwające wyszukiwania kończą się, kolejne adresy nie są już pobierane. """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.is_finished:
+                self._finish(job, CANCELLED)
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        if status == DONE:
+            job._journal.discard()  # Partia zakończona - dziennik nie jest już potrzebny
+        elif job._in_flight == 0:
+            job._journal.close()  # Dziennik przerwanej partii zostaje - ponowne wysłanie ją wznowi
+
+    def _expire(self):
+        now = time.time()
+        for key in [key for key, job in self._jobs.items() if job.is_finished and now - job.finished > self.ttl]:
+            del self._jobs[key]
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"geo-job-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_task(self):
+        """ Czeka na następny adres do wyszukania; zadania obsługiwane są na zmianę (po jednym adresie). """
+        with self._condition:
+            while True:
+                while self._queue and not self._queue[0]._has_tasks():
+                    self._queue.popleft()
+                if self._queue:
+                    job = self._queue[0]
+                    self._queue.rotate(-1)
+                    index = job._pending[job._next]
+                    job._next += 1
+                    job._in_flight += 1
+                    if job.status == QUEUED:
+                        job.status, job.started = RUNNING, time.time()
+                    return job, index
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            job, index = self._next_task()
+            address = job.unique[index]
+            try:
+                with METRICS.recording_to(job.metrics):
+                    result = tuple(self.lookup(address))
+            except Exception as e:
+                result = (f"Błąd: {e}", "Błąd przy wyszukiwaniu")
+            if is_final_result(result[0]):
+                job._journal.record(address, result)
+            with self._condition:
+                job._in_flight -= 1
+                job._set_result(index, result)
+                if job.status == RUNNING and job.completed == job.total:
+                    self._finish(job, DONE)
+                elif job.status == CANCELLED and job._in_flight == 0:
+                    job._journal.close()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_job_service():
+    """ Zwraca usługę zadań współdzieloną przez wszystkie sesje w procesie serwera. """
+    global _service
+    with _service_lock:
+        if _service is None:
+            from geocoder import lookup_address
+            _service = JobService(lookup_address)
+        return _service
@@ -0,0 +1,78 @@
+# Importy wbudowane
+import os
+import json
+import hashlib
+import threading
+
+# === KONFIGURACJA ===
+JOURNAL_DIR = os.environ.get("GEO_JOURNAL_DIR", "journals")  # Katalog dzienników partii uruchamianych z UI
+
+
+# === DZIENNIK ===
+class Journal:
+    """ Dziennik ukończonych wyszukiwań partii (plik JSON Lines, tylko dopisywanie).
+
+    Po restarcie tej samej partii wpisy z dziennika pozwalają pominąć wykonane już wyszukiwania.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def entries(self):
+        """ Strumieniowo zwraca pary (klucz, wartość) zapisane w dzienniku. """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Ostatnia linia mogła zostać urwana przy awarii procesu
+                yield entry["key"], entry["value"]
+
+    def completed(self):
+        """ Zwraca zbiór kluczy ukończonych wyszukiwań. """
+        return {key for key, _ in self.entries()}
+
+    def record(self, key, value):
+        """ Dopisuje ukończone wyszukiwanie i od razu zrzuca je na dysk. """
+        line = json.dumps({"key": key, "value": value}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """ Usuwa dziennik po zakończeniu całej partii. """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# === FUNKCJE ===
+def job_id(items):
+    """ Zwraca identyfikator partii wyznaczony z jej zawartości (ta sama lista = ta sama partia). """
+    digest = hashlib.sha1()
+    for item in items:
+        digest.update(item.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()[:16]
+
+def job_journal(items):
+    """ Zwraca dziennik partii złożonej z podanych adresów. """
+    return Journal(os.path.join(JOURNAL_DIR, f"{job_id(items)}.jsonl"))
+
+def is_final_result(map_link):
+    """ Sprawdza, czy wynik można zapisać w dzienniku - błędy mają zostać ponowione po restarcie. """
+    return not map_link.startswith("Błąd")
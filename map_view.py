@@ -0,0 +1,95 @@
+# Importy wbudowane
+import math
+
+# Importy zewnętrzne (folium, pydeck, pandas) ładowane są dopiero przy rysowaniu mapy
+
+# === KONFIGURACJA ===
+CLUSTER_THRESHOLD = 200  # Od tylu punktów znaczniki Folium są grupowane (klastry)
+WEBGL_THRESHOLD = 2000  # Od tylu punktów mapa rysowana jest przez pydeck (WebGL)
+
+# Znaczniki w klastrze tworzone są po stronie przeglądarki z tablicy [lat, lon, adres]
+CLUSTER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: L.AwesomeMarkers.icon({markerColor: 'red'})});
+    marker.bindPopup(row[2]);
+    return marker;
+};
+"""
+
+
+# === FUNKCJE ===
+def map_bounds(locations):
+    """ Zwraca [[min_lat, min_lon], [max_lat, max_lon]] dla wszystkich punktów. """
+    lats = [loc['lat'] for loc in locations]
+    lons = [loc['lon'] for loc in locations]
+    return [[min(lats), min(lons)], [max(lats), max(lons)]]
+
+def bounds_zoom(bounds):
+    """ Szacuje poziom przybliżenia, przy którym cały prostokąt punktów mieści się na mapie. """
+    (min_lat, min_lon), (max_lat, max_lon) = bounds
+    span = max(max_lon - min_lon, (max_lat - min_lat) * 1.6, 1e-4)
+    return max(1, min(15, math.log2(360 / span)))
+
+def map_mode(locations):
+    """ Wybiera sposób rysowania mapy na podstawie liczby punktów: "markers", "cluster" albo "webgl". """
+    if len(locations) >= WEBGL_THRESHOLD:
+        return "webgl"
+    if len(locations) >= CLUSTER_THRESHOLD:
+        return "cluster"
+    return "markers"
+
+# Funkcja do tworzenia mapy Folium z czerwonymi znacznikami
+def create_folium_map(locations):
+    import folium
+    from folium.plugins import FastMarkerCluster
+
+    bounds = map_bounds(locations)
+    # Tworzenie mapy na środku prostokąta obejmującego wszystkie punkty
+    m = folium.Map(location=[(bounds[0][0] + bounds[1][0]) / 2, (bounds[0][1] + bounds[1][1]) / 2], zoom_start=12)
+    if len(locations) >= CLUSTER_THRESHOLD:
+        # Dużo punktów - jedna kompaktowa tablica danych i klastry zamiast osobnego znacznika HTML na punkt
+        FastMarkerCluster(
+            [[loc['lat'], loc['lon'], loc.get('address', 'Brak adresu')] for loc in locations],
+            callback=CLUSTER_CALLBACK
+        ).add_to(m)
+    else:
+        # Dodawanie markerów na mapie z czerwonym kolorem
+        for loc in locations:
+            folium.Marker(
+                [loc['lat'], loc['lon']],
+                popup=loc.get('address', 'Brak adresu'),
+                icon=folium.Icon(color='red')
+            ).add_to(m)
+    if len(locations) > 1:
+        m.fit_bounds(bounds)
+    # Zwracanie mapy jako obiekt HTML
+    return m._repr_html_()
+
+def create_pydeck_map(locations):
+    """ Tworzy mapę WebGL (pydeck ScatterplotLayer) dla tysięcy punktów. """
+    import pandas as pd
+    import pydeck as pdk
+
+    bounds = map_bounds(locations)
+    # Dane warstwy jako zwarte kolumny zamiast listy słowników z dodatkowymi polami
+    data = {
+        'lat': [loc['lat'] for loc in locations],
+        'lon': [loc['lon'] for loc in locations],
+        'address': [loc.get('address', 'Brak adresu') for loc in locations],
+    }
+    layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=pd.DataFrame(data),
+        get_position=["lon", "lat"],
+        get_fill_color=[220, 30, 30, 200],
+        get_radius=40,
+        radius_min_pixels=3,
+        radius_max_pixels=12,
+        pickable=True,
+    )
+    view_state = pdk.ViewState(
+        latitude=(bounds[0][0] + bounds[1][0]) / 2,
+        longitude=(bounds[0][1] + bounds[1][1]) / 2,
+        zoom=bounds_zoom(bounds),
+    )
+    return pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip={"text": "{address}"})
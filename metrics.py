@@ -0,0 +1,204 @@
+# Importy wbudowane
+import os
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# === KONFIGURACJA ===
+METRICS_PORT = int(os.environ.get("GEO_METRICS_PORT", 0))  # Port endpointu /metrics (0 = wyłączony)
+
+# Etapy pojedynczego wyszukiwania mierzone osobno
+STAGES = (
+    "driver_start",        # Uruchomienie przeglądarki
+    "page_load",           # Załadowanie Map Google
+    "cookie_consent",      # Akceptacja cookies
+    "search_submit",       # Wpisanie i wysłanie adresu
+    "url_settle",          # Oczekiwanie na link ze współrzędnymi
+    "address_extraction",  # Oczekiwanie na adres z wyniku (span.DkEaL)
+    "http_request",        # Zapytanie backendu HTTP
+    "lookup_total",        # Całe wyszukiwanie (łącznie z cache)
+)
+# Wyniki wyszukiwań
+OUTCOMES = ("success", "no_coordinates", "too_general", "error")
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# === METRYKI ===
+class Histogram:
+    """ Histogram czasów w przedziałach BUCKETS (jak w Prometheusie - liczniki skumulowane przy eksporcie). """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Ostatni przedział: powyżej największej granicy
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """ Zbiór metryk procesu: histogramy czasów etapów i liczniki wyników wyszukiwań. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.counters = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self.histograms[stage].observe(seconds)
+        target = getattr(self._local, "target", None)
+        if target is not None:
+            target.observe(stage, seconds)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        target = getattr(self._local, "target", None)
+        if target is not None:
+            target.count(name, value)
+
+    @contextmanager
+    def recording_to(self, target):
+        """ Pomiary z bieżącego wątku trafiają w tym bloku także do target (np. metryk jednego zadania). """
+        previous = getattr(self._local, "target", None)
+        self._local.target = target
+        try:
+            yield
+        finally:
+            self._local.target = previous
+
+    @contextmanager
+    def timer(self, stage):
+        """ Mierzy czas bloku kodu jako etap stage. """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def snapshot(self):
+        """ Zwraca kopię stanu metryk (np. na początek partii - do podsumowania). """
+        with self._lock:
+            return {
+                "stages": {stage: (histogram.count, histogram.sum) for stage, histogram in self.histograms.items()},
+                "counters": dict(self.counters),
+            }
+
+    def summary_since(self, snapshot):
+        """ Zwraca podsumowanie partii: liczba i średni czas etapów oraz liczniki od momentu snapshot. """
+        current = self.snapshot()
+        stages = {}
+        for stage, (count, total) in current["stages"].items():
+            start_count, start_total = snapshot["stages"].get(stage, (0, 0.0))
+            if count > start_count:
+                stages[stage] = {"count": count - start_count, "mean_s": (total - start_total) / (count - start_count)}
+        counters = {name: value - snapshot["counters"].get(name, 0) for name, value in current["counters"].items()
+                    if value != snapshot["counters"].get(name, 0)}
+        return {"stages": stages, "counters": counters}
+
+    def export(self):
+        """ Zwraca pełny stan metryk w postaci do przesłania między procesami (np. z procesu potomnego partii). """
+        with self._lock:
+            return {
+                "histograms": {stage: (list(histogram.counts), histogram.sum, histogram.count)
+                               for stage, histogram in self.histograms.items() if histogram.count},
+                "counters": dict(self.counters),
+            }
+
+    def merge(self, exported):
+        """ Dodaje metryki zwrócone przez export() (np. z procesu potomnego) do metryk tego procesu. """
+        with self._lock:
+            for stage, (counts, total, count) in exported["histograms"].items():
+                histogram = self.histograms[stage]
+                histogram.counts = [mine + theirs for mine, theirs in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+            for name, value in exported["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        """ Zwraca podsumowanie wszystkich pomiarów (jak summary_since od pustego stanu). """
+        return self.summary_since({"stages": {}, "counters": {}})
+
+    def to_prometheus(self):
+        """ Zwraca metryki w formacie tekstowym Prometheusa. """
+        lines = [
+            "# HELP geo_stage_seconds Czas etapów wyszukiwania adresu.",
+            "# TYPE geo_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, histogram in self.histograms.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'geo_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'geo_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'geo_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'geo_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            lines.append("# HELP geo_events_total Liczniki wyników i źródeł wyszukiwań.")
+            lines.append("# TYPE geo_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'geo_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+# === FUNKCJE ===
+def classify_outcome(map_link, search_name, has_coordinates):
+    """ Przypisuje wynik wyszukiwania do jednej z kategorii OUTCOMES. """
+    if map_link.startswith("Błąd"):
+        return "error"
+    if not has_coordinates:
+        return "no_coordinates"
+    if search_name.startswith("Nazwa jest zbyt ogólna"):
+        return "too_general"
+    return "success"
+
+def write_textfile(path):
+    """ Zapisuje metryki do pliku (np. dla kolektora textfile node_exportera). """
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        handle.write(METRICS.to_prometheus())
+    os.replace(temporary, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = METRICS.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # Bez logowania każdego odpytania
+
+
+_server = None
+_server_lock = threading.Lock()
+
+def serve_metrics(port=METRICS_PORT):
+    """ Uruchamia (raz na proces) endpoint http://<host>:port/metrics w wątku w tle. """
+    global _server
+    with _server_lock:
+        if _server is None and port:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
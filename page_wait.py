@@ -0,0 +1,142 @@
+# Importy wbudowane
+import os
+import re
+import time
+from collections import namedtuple
+
+# Importy zewnętrzne
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+# === KONFIGURACJA ===
+SETTLE_TIMEOUT = float(os.environ.get("GEO_SETTLE_TIMEOUT", 15))  # Twardy limit czasu oczekiwania na wynik (s)
+ADDRESS_GRACE = float(os.environ.get("GEO_ADDRESS_GRACE", 1.5))  # Jak długo czekać na adres, gdy link jest już gotowy (s)
+SEARCH_BOX_TIMEOUT = 7  # Limit czasu oczekiwania na pole wyszukiwania (s)
+POLL_INTERVAL = 0.1
+
+SEARCH_BOX_ID = "searchboxinput"
+ADDRESS_SELECTOR = 'span.DkEaL'
+COORDINATES_IN_URL = re.compile(r'@-?\d+(?:\.\d+)?,-?\d+(?:\.\d+)?')
+# Link konkretnego miejsca - w linku "/maps/search/<q>/@..." może być jeszcze poprzedni widok mapy
+PLACE_URL = re.compile(r'/maps/place/|!3d-?\d')
+NO_RESULT_XPATH = '//*[contains(text(), "nie mogą znaleźć") or contains(text(), "can\'t find")]'
+CONSENT_URL = "consent.google."
+BLOCKED_URL = "/sorry/"
+CAPTCHA_XPATH = ('//iframe[contains(@src, "recaptcha")] | '
+                 '//*[contains(text(), "nietypowy ruch") or contains(text(), "unusual traffic")]')
+
+# Statusy zwracane przez wait_for_result
+FOUND = "found"            # Link ze współrzędnymi i adres z wyniku
+NO_ADDRESS = "no_address"  # Link miejsca lub nowy widok mapy (np. lista wyników) ustabilizował się bez adresu
+NO_RESULT = "no_result"    # Google Maps nie znalazły adresu
+TIMEOUT = "timeout"        # Strona nadal się ładuje po upływie limitu czasu
+CONSENT = "consent"        # Zamiast Map pojawiło się okno zgody na cookies
+BLOCKED = "blocked"        # Google pokazało CAPTCHA / stronę o nietypowym ruchu
+
+# url_seconds - czas do pojawienia się linku ze współrzędnymi, address_seconds - czas od linku do adresu
+SettleResult = namedtuple("SettleResult", ["status", "url", "address", "url_seconds", "address_seconds"])
+
+
+# === FUNKCJE ===
+def address_element_ids(driver):
+    """ Zwraca identyfikatory elementów z adresem widocznych przed wyszukiwaniem (aby nie odczytać starego wyniku). """
+    return {element.id for element in driver.find_elements(By.CSS_SELECTOR, ADDRESS_SELECTOR)}
+
+def _new_address(driver, previous_ids):
+    """ Zwraca tekst nowego elementu span.DkEaL albo None, jeśli jeszcze go nie ma. """
+    for element in driver.find_elements(By.CSS_SELECTOR, ADDRESS_SELECTOR):
+        if element.id in previous_ids:
+            continue
+        try:
+            text = element.text
+        except WebDriverException:
+            continue  # Element zniknął w trakcie odczytu
+        if text:
+            return text
+    return None
+
+def _viewport(url):
+    """ Zwraca fragment "@lat,lon" z linku albo None. """
+    match = COORDINATES_IN_URL.search(url or "")
+    return match.group(0) if match else None
+
+def page_obstacle(driver, url=None):
+    """ Zwraca CONSENT albo BLOCKED, jeśli zamiast Map widać okno zgody lub CAPTCHA; w przeciwnym razie None. """
+    url = url if url is not None else driver.current_url
+    if CONSENT_URL in url:
+        return CONSENT
+    if BLOCKED_URL in url or driver.find_elements(By.XPATH, CAPTCHA_XPATH):
+        return BLOCKED
+    return None
+
+def wait_for_search_box(tab, timeout=SEARCH_BOX_TIMEOUT):
+    """ Czeka, aż pole wyszukiwania w karcie będzie gotowe do wpisania adresu.
+
+    Zwraca None, gdy pole jest gotowe, CONSENT/BLOCKED, gdy zasłania je okno zgody lub CAPTCHA, a TIMEOUT po upływie limitu.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        with tab.active() as driver:
+            for element in driver.find_elements(By.ID, SEARCH_BOX_ID):
+                try:
+                    if element.is_displayed() and element.is_enabled():
+                        return None
+                except WebDriverException:
+                    pass  # Element zniknął w trakcie sprawdzania
+            if time.monotonic() >= deadline:
+                return page_obstacle(driver) or TIMEOUT
+        time.sleep(POLL_INTERVAL)
+
+def wait_for_result(tab, previous_url, previous_ids=(), timeout=SETTLE_TIMEOUT):
+    """ Czeka, aż wynik wyszukiwania będzie gotowy, zamiast stałego time.sleep().
+
+    Kończy się od razu, gdy adres URL zawiera fragment "@lat,lon" i pojawi się nowy span.DkEaL.
+    Wynik bez adresu (NO_ADDRESS) jest przyjmowany po ADDRESS_GRACE stabilnego linku miejsca (/maps/place/ albo
+    pinezka !3d…!4d) lub linku z nowym widokiem mapy (np. lista wyników dla niejednoznacznego adresu) - link
+    wyszukiwania ze środkiem poprzedniego widoku mapy nie jest jeszcze wynikiem, więc wtedy czekamy dalej.
+    Rozróżnia brak wyniku (komunikat Google) od strony, która wciąż się ładuje (TIMEOUT),
+    oraz od przekierowania na okno zgody lub CAPTCHA (CONSENT, BLOCKED).
+    Każde sprawdzenie strony odbywa się w kontekście karty tab (driver_pool.BrowserTab), więc między
+    sprawdzeniami z tej samej przeglądarki mogą korzystać wyszukiwania w innych kartach.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    previous_viewport = _viewport(previous_url)
+    last_url = None
+    url_stable_since = None
+    url_ready_at = None
+
+    while True:
+        with tab.active() as driver:
+            now = time.monotonic()
+            url = driver.current_url
+
+            # Przekierowanie na zgodę/CAPTCHA widać od razu w adresie - nie czekamy do limitu czasu
+            if CONSENT_URL in url:
+                return SettleResult(CONSENT, url, None, None, None)
+            if BLOCKED_URL in url:
+                return SettleResult(BLOCKED, url, None, None, None)
+
+            if url != previous_url and COORDINATES_IN_URL.search(url):
+                if url_ready_at is None:
+                    url_ready_at = now
+                address = _new_address(driver, previous_ids)
+                if address:
+                    # Adres z panelu miejsca - link odczytujemy ponownie, bo mógł się zmienić razem z panelem
+                    return SettleResult(FOUND, driver.current_url, address,
+                                        url_ready_at - started, time.monotonic() - url_ready_at)
+
+                if url != last_url:
+                    last_url, url_stable_since = url, now
+                elif now - url_stable_since >= ADDRESS_GRACE and (PLACE_URL.search(url)
+                                                                  or _viewport(url) != previous_viewport):
+                    return SettleResult(NO_ADDRESS, url, None, url_ready_at - started, None)
+
+            if driver.find_elements(By.XPATH, NO_RESULT_XPATH):
+                return SettleResult(NO_RESULT, url, None, None, None)
+
+            if now >= deadline:
+                # CAPTCHA może być osadzona w stronie Map bez zmiany adresu
+                return SettleResult(page_obstacle(driver, url) or TIMEOUT, url, None, None, None)
+
+        time.sleep(POLL_INTERVAL)
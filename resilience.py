@@ -0,0 +1,190 @@
+# Importy wbudowane
+import os
+import time
+import random
+import threading
+from collections import deque
+
+# Moduły aplikacji
+from metrics import METRICS
+
+# === KONFIGURACJA ===
+RETRY_ATTEMPTS = int(os.environ.get("GEO_RETRY_ATTEMPTS", 3))  # Łączna liczba prób jednego wyszukiwania
+RETRY_BASE_DELAY = float(os.environ.get("GEO_RETRY_BASE_DELAY", 1.0))  # Bazowe opóźnienie ponowienia (s)
+RETRY_MAX_DELAY = float(os.environ.get("GEO_RETRY_MAX_DELAY", 30.0))
+TIMEOUT_RETRIES = int(os.environ.get("GEO_TIMEOUT_RETRIES", 1))  # Ile razy najwyżej ponawiać przekroczenie czasu
+
+BREAKER_WINDOW = int(os.environ.get("GEO_BREAKER_WINDOW", 20))  # Liczba ostatnich wyszukiwań branych pod uwagę
+BREAKER_MIN_CALLS = int(os.environ.get("GEO_BREAKER_MIN_CALLS", 5))
+BREAKER_THRESHOLD = float(os.environ.get("GEO_BREAKER_THRESHOLD", 0.5))  # Odsetek blokad otwierający wyłącznik
+BREAKER_COOLDOWN = float(os.environ.get("GEO_BREAKER_COOLDOWN", 60.0))  # Pierwsza przerwa po otwarciu (s)
+BREAKER_MAX_COOLDOWN = float(os.environ.get("GEO_BREAKER_MAX_COOLDOWN", 900.0))
+
+# Rodzaje błędów wyszukiwania
+TIMEOUT = "timeout"            # Strona nie pokazała wyniku w czasie
+CONSENT = "consent"            # Okno zgody na cookies zamiast Map
+BLOCKED = "blocked"            # CAPTCHA / "nietypowy ruch" - Google blokuje sesję
+NO_RESULT = "no_result"        # Google Maps nie znalazły adresu (wynik ostateczny, nie błąd)
+DRIVER_CRASH = "driver_crash"  # Przeglądarka przestała odpowiadać
+UNKNOWN = "unknown"
+
+FAILURE_LABELS = {
+    TIMEOUT: "Przekroczono czas oczekiwania na wynik",
+    CONSENT: "Okno zgody na cookies zablokowało wyszukiwanie",
+    BLOCKED: "Google zablokowało zapytania (CAPTCHA)",
+    NO_RESULT: "Google Maps nie znalazły adresu",
+    DRIVER_CRASH: "Awaria przeglądarki",
+    UNKNOWN: "Błąd przy wyszukiwaniu",
+}
+# Błędy, po których warto spróbować ponownie (blokady wstrzymują partię przez wyłącznik)
+TRANSIENT = {TIMEOUT, CONSENT, BLOCKED, DRIVER_CRASH}
+# Błędy, po których przeglądarka jest zamykana (nowa ma świeżą sesję) - po przekroczeniu czasu karta wraca do puli
+RECYCLE = {CONSENT, BLOCKED, DRIVER_CRASH}
+
+# Fragmenty komunikatów Selenium świadczące o utracie przeglądarki
+CRASH_MESSAGES = ("chrome not reachable", "disconnected", "session deleted", "target window already closed",
+                  "tab crashed", "connection refused")
+
+
+# === BŁĘDY ===
+class LookupFailure(Exception):
+    """ Sklasyfikowany błąd wyszukiwania; kind to jeden z TIMEOUT, CONSENT, BLOCKED, NO_RESULT, DRIVER_CRASH, UNKNOWN. """
+
+    def __init__(self, kind, message=""):
+        super().__init__(message or FAILURE_LABELS[kind])
+        self.kind = kind
+
+    @property
+    def transient(self):
+        return self.kind in TRANSIENT
+
+    @property
+    def recycles_browser(self):
+        return self.kind in RECYCLE
+
+    @property
+    def label(self):
+        return FAILURE_LABELS[self.kind]
+
+
+def classify_exception(error):
+    """ Zamienia dowolny wyjątek z wyszukiwania na LookupFailure. """
+    if isinstance(error, LookupFailure):
+        return error
+    # Selenium ładowane jest dopiero przy pierwszym wyszukiwaniu w przeglądarce
+    from selenium.common.exceptions import (TimeoutException, InvalidSessionIdException, NoSuchWindowException,
+                                            WebDriverException)
+    message = str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__
+    if isinstance(error, TimeoutException):
+        return LookupFailure(TIMEOUT, message)
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return LookupFailure(DRIVER_CRASH, message)
+    if isinstance(error, WebDriverException) and any(text in message.lower() for text in CRASH_MESSAGES):
+        return LookupFailure(DRIVER_CRASH, message)
+    return LookupFailure(UNKNOWN, message)
+
+
+# === PONAWIANIE ===
+def backoff_delay(attempt, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """ Opóźnienie przed ponowieniem numer attempt (od 0): wykładnicze z pełnym losowym rozrzutem. """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+def retry(call, attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+          timeout_retries=TIMEOUT_RETRIES):
+    """ Wywołuje call() i ponawia je po przejściowych błędach LookupFailure; ostatni błąd jest zgłaszany dalej.
+
+    Przekroczenie czasu ponawiane jest najwyżej timeout_retries razy - każda próba trwa pełny limit oczekiwania.
+    """
+    timeouts = 0
+    for attempt in range(max(1, attempts)):
+        try:
+            return call()
+        except LookupFailure as failure:
+            if failure.kind == TIMEOUT:
+                timeouts += 1
+            if not failure.transient or attempt + 1 >= attempts or timeouts > timeout_retries:
+                raise
+            METRICS.count(f"retry_{failure.kind}")
+            time.sleep(backoff_delay(attempt, base_delay, max_delay))
+
+
+# === WYŁĄCZNIK ===
+CLOSED = "closed"        # Wyszukiwania przechodzą normalnie
+OPEN = "open"            # Partia wstrzymana do upływu przerwy
+HALF_OPEN = "half_open"  # Po przerwie - jedno wyszukiwanie próbne decyduje o wznowieniu
+
+
+class CircuitBreaker:
+    """ Wstrzymuje wszystkie wyszukiwania, gdy odsetek blokad wśród ostatnich window wyszukiwań przekroczy threshold.
+
+    Po przerwie przepuszcza jedno wyszukiwanie próbne: udane wznawia partię, kolejna blokada
+    otwiera wyłącznik ponownie z dwukrotnie dłuższą przerwą (do max_cooldown).
+    """
+
+    def __init__(self, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS, threshold=BREAKER_THRESHOLD,
+                 cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.min_calls = min_calls
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.open_until = 0.0
+        self._results = deque(maxlen=window)  # True = blokada
+        self._probing = False
+        self._condition = threading.Condition()
+
+    def _open(self):
+        self.state = OPEN
+        self.open_until = time.monotonic() + self.cooldown
+        self._results.clear()
+        METRICS.count("breaker_open")
+
+    def before_call(self):
+        """ Blokuje wywołującego, dopóki wyłącznik jest otwarty (albo trwa wyszukiwanie próbne). """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self.state == OPEN and now >= self.open_until:
+                    self.state, self._probing = HALF_OPEN, False
+                if self.state == CLOSED:
+                    return
+                if self.state == HALF_OPEN and not self._probing:
+                    self._probing = True
+                    return
+                self._condition.wait(self.open_until - now if self.state == OPEN else None)
+
+    def record(self, blocked):
+        """ Zapisuje wynik wyszukiwania (blocked=True dla CAPTCHA/blokady) i w razie potrzeby przełącza stan. """
+        with self._condition:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if blocked:
+                    self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                    self._open()
+                else:
+                    self.state, self.cooldown = CLOSED, self.base_cooldown
+                self._condition.notify_all()
+                return
+            if self.state == OPEN:
+                return  # Wyniki wyszukiwań rozpoczętych przed otwarciem nie zmieniają przerwy
+            self._results.append(blocked)
+            if len(self._results) >= self.min_calls and sum(self._results) / len(self._results) >= self.threshold:
+                self._open()
+
+    def paused_for(self):
+        """ Zwraca, ile sekund zostało do końca przerwy (0, gdy wyszukiwania nie są wstrzymane). """
+        with self._condition:
+            return max(0.0, self.open_until - time.monotonic()) if self.state == OPEN else 0.0
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+def get_breaker():
+    """ Zwraca wyłącznik współdzielony przez wszystkie wyszukiwania w procesie. """
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
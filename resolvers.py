@@ -0,0 +1,139 @@
+# Importy wbudowane
+import os
+import re
+from urllib.parse import quote, unquote, unquote_plus
+
+# Moduły aplikacji
+from metrics import METRICS
+from resilience import LookupFailure, BLOCKED
+
+# === KONFIGURACJA ===
+# Kolejność backendów wyszukiwania - backend HTTP ("http,selenium") sprawdzony jest tylko na lokalnej atrapie Map
+RESOLVERS = os.environ.get("GEO_RESOLVERS", "selenium")
+HTTP_BASE_URL = os.environ.get("GEO_HTTP_BASE_URL", "https://www.google.com")  # Np. lokalny serwer-atrapa w testach
+HTTP_TIMEOUT = float(os.environ.get("GEO_HTTP_TIMEOUT", 10))
+HTTP_POOL_SIZE = int(os.environ.get("GEO_HTTP_POOL_SIZE", 10))  # Liczba utrzymywanych połączeń keep-alive
+HTTP_BLOCKED_STATUSES = (403, 429)  # Odpowiedzi, którymi Google ogranicza zapytania
+
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/124.0 Safari/537.36")
+
+# Dokładna pinezka miejsca w danych linku: !3d<lat>!4d<lon>
+PIN_PATTERN = re.compile(r'!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)')
+# Link miejsca, na który Google przekierowuje jednoznaczne wyszukiwanie: /maps/place/<nazwa>/...
+PLACE_URL_PATTERN = re.compile(r'/maps/place/([^/?#]+)')
+
+# Wyszukany adres dla linku miejsca bez adresu w panelu - taki wynik nie trafia do cache
+NO_EXACT_ADDRESS = "Brak dokładnego adresu"
+
+
+# === FUNKCJE ===
+def check_search_name(search_name):
+    """ Zamienia zbyt ogólny wynik (miasto, dzielnica) na komunikat dla użytkownika. """
+    if "Warszawa" in search_name or "dzielnica" in search_name or len(search_name.split(',')) > 2:
+        return "Nazwa jest zbyt ogólna, aby jednoznacznie zidentyfikować lokalizację."
+    return search_name
+
+
+def place_link(base_url, search_name, latitude, longitude):
+    """ Buduje link do miejsca w Mapach Google ze współrzędnymi w formacie "@lat,lon". """
+    return f"{base_url}/maps/place/{quote(search_name)}/@{latitude},{longitude},17z"
+
+
+# === BACKENDY ===
+class Resolver:
+    """ Interfejs backendu wyszukiwania: resolve(adres) zwraca (link, wyszukany adres) albo None,
+    gdy backend nie potrafi rozstrzygnąć zapytania (wtedy próbowany jest kolejny backend). """
+
+    name = "resolver"
+
+    def resolve(self, address):
+        raise NotImplementedError
+
+
+class HttpResolver(Resolver):
+    """ Szybki backend bez przeglądarki - pobiera stronę wyników Map Google i parsuje ją bezpośrednio. """
+
+    name = "http"
+
+    def __init__(self, base_url=HTTP_BASE_URL, timeout=HTTP_TIMEOUT, pool_size=HTTP_POOL_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        import requests
+        from requests.adapters import HTTPAdapter
+        # Jedna sesja z pulą połączeń keep-alive współdzielona przez wszystkie wątki
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "pl-PL,pl;q=0.9"})
+        self.session.cookies.set("CONSENT", "YES+", domain=".google.com")  # Pomija okno zgody na cookies
+
+    def search_url(self, address):
+        return f"{self.base_url}/maps/search/{quote(address, safe='')}?hl=pl"
+
+    def resolve(self, address):
+        import requests
+        try:
+            with METRICS.timer("http_request"):
+                response = self.session.get(self.search_url(address), timeout=self.timeout)
+        except requests.RequestException:
+            METRICS.count("http_error")
+            return None
+        if response.status_code in HTTP_BLOCKED_STATUSES or "/sorry/" in response.url:
+            METRICS.count("http_blocked")
+            raise LookupFailure(BLOCKED, f"HTTP {response.status_code}")  # Blokadę widzi wyłącznik wyszukiwań
+        if response.status_code != 200 or "consent." in response.url:
+            METRICS.count("http_unresolved")
+            return None  # Błąd serwera lub okno zgody - decyzję zostawiamy przeglądarce
+        result = self.parse(response.text, response.url)
+        METRICS.count("http_resolved" if result is not None else "http_unresolved")
+        return result
+
+    def parse(self, body, url=""):
+        """ Wyciąga współrzędne i nazwę miejsca z odpowiedzi; None, jeśli wynik nie jest jednoznaczny.
+
+        Przyjmowany jest tylko wynik przekierowany na link miejsca z pinezką (!3d…!4d…) - środek statycznej mapy
+        to środek widoku, a tytuł i pinezki w treści strony mogą dotyczyć innych miejsc. Resztę rozstrzyga przeglądarka.
+        Wyszukany adres to nazwa miejsca z linku (nie adres z panelu miejsca jak w przeglądarce), sprawdzana
+        tak samo jak adres z przeglądarki (check_search_name).
+        """
+        place = PLACE_URL_PATTERN.search(url)
+        pin = PIN_PATTERN.search(unquote(url))
+        if place is None or pin is None:
+            return None
+        search_name = unquote_plus(place.group(1)).strip()
+        if not search_name:
+            return None
+
+        latitude, longitude = pin.group(1), pin.group(2)
+        map_link = place_link(self.base_url, search_name, latitude, longitude)
+        return map_link, check_search_name(search_name)
+
+
+class SeleniumResolver(Resolver):
+    """ Backend oparty o przeglądarkę (pula Chrome) - wolniejszy, ale radzi sobie z każdą stroną wyników. """
+
+    name = "selenium"
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+
+    def resolve(self, address):
+        return self.lookup(address)
+
+
+class ChainResolver(Resolver):
+    """ Próbuje kolejnych backendów, aż któryś zwróci wynik; ostatni backend pełni rolę zapasowego. """
+
+    name = "chain"
+
+    def __init__(self, resolvers):
+        self.resolvers = list(resolvers)
+
+    def resolve(self, address):
+        for resolver in self.resolvers:
+            result = resolver.resolve(address)
+            if result is not None:
+                return result
+        return None
@@ -0,0 +1,110 @@
+# Importy wbudowane
+import hashlib
+from array import array
+
+
+# === MAGAZYN WYNIKÓW ===
+class ResultStore:
+    """ Zwarty, kolumnowy magazyn wyników wyszukiwania - jedna kopia danych dla tabeli, mapy i eksportu.
+
+    Współrzędne trzymane są w tablicach float64, teksty w listach; widoki (rekordy, punkty mapy,
+    DataFrame) są tworzone w locie, zamiast przechowywać w sesji kilka list słowników.
+    Kolumny pochodne (np. najbliższy punkt i odległość) dopisuje się do kompletnych wyników przez set_column.
+    """
+
+    __slots__ = ("_addresses", "_names", "_links", "_lat", "_lon", "_extra", "_hash")
+
+    def __init__(self):
+        self._addresses = []
+        self._names = []
+        self._links = []
+        self._lat = array('d')
+        self._lon = array('d')
+        self._extra = {}  # nazwa kolumny pochodnej -> lista wartości (po jednej na wiersz)
+        self._hash = None
+
+    def __len__(self):
+        return len(self._addresses)
+
+    def append(self, address, name, latitude, longitude, link):
+        self._addresses.append(address)
+        self._names.append(name)
+        self._links.append(link)
+        self._lat.append(float(latitude))
+        self._lon.append(float(longitude))
+        self._extra.clear()  # Kolumny pochodne dotyczyły poprzedniego zestawu wierszy
+        self._hash = None
+
+    def set_column(self, name, values):
+        """ Dodaje (albo zastępuje) kolumnę pochodną - po jednej wartości na wiersz wyników. """
+        values = list(values)
+        if len(values) != len(self):
+            raise ValueError(f"Kolumna {name}: {len(values)} wartości dla {len(self)} wierszy")
+        self._extra[name] = values
+        self._hash = None
+
+    def columns(self):
+        """ Zwraca nazwy kolumn wyników (podstawowe i pochodne) w kolejności tabeli i eksportu. """
+        return ["Adres", "Wyszukany adres", "Latitude", "Longitude", "Link", *self._extra]
+
+    def coordinates(self):
+        """ Zwraca tablice szerokości i długości geograficznej (float64, bez kopiowania). """
+        return self._lat, self._lon
+
+    def records(self):
+        """ Zwraca rekordy (słowniki z kluczami jak w tabeli wyników) jeden po drugim - np. dla eksportu strumieniowego. """
+        extra = list(self._extra.items())
+        rows = zip(self._addresses, self._names, self._lat, self._lon, self._links)
+        for index, (address, name, lat, lon, link) in enumerate(rows):
+            record = {"Adres": address, "Wyszukany adres": name, "Latitude": lat, "Longitude": lon, "Link": link}
+            for column, values in extra:
+                record[column] = values[index]
+            yield record
+
+    def locations(self):
+        """ Zwraca widok punktów mapy ({'lat', 'lon', 'address'}) bez kopiowania danych. """
+        return LocationsView(self)
+
+    def to_frame(self):
+        """ Tworzy DataFrame z kolumn magazynu (współrzędne jako float64, bez formatowania do tekstu). """
+        import numpy as np
+        import pandas as pd
+        return pd.DataFrame({
+            "Adres": self._addresses,
+            "Wyszukany adres": self._names,
+            "Latitude": np.array(self._lat, dtype=np.float64),
+            "Longitude": np.array(self._lon, dtype=np.float64),
+            "Link": self._links,
+            **self._extra,
+        })
+
+    def content_hash(self):
+        """ Zwraca skrót zawartości wyników (liczony raz) - klucz dla zapamiętanych tabeli, mapy i eksportu. """
+        if self._hash is None:
+            digest = hashlib.sha1()
+            digest.update(self._lat.tobytes())
+            digest.update(self._lon.tobytes())
+            for column in (self._addresses, self._names, self._links):
+                digest.update("\x1f".join(column).encode("utf-8"))
+                digest.update(b"\x1e")
+            for name, values in self._extra.items():
+                digest.update(f"{name}\x1f{values!r}".encode("utf-8"))
+            self._hash = digest.hexdigest()
+        return self._hash
+
+
+class LocationsView:
+    """ Widok magazynu jako sekwencji punktów mapy - zgodny z funkcjami map_view. """
+
+    __slots__ = ("_store",)
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return len(self._store)
+
+    def __iter__(self):
+        store = self._store
+        for lat, lon, name in zip(store._lat, store._lon, store._names):
+            yield {'lat': lat, 'lon': lon, 'address': name}
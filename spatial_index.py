@@ -0,0 +1,209 @@
+# Importy wbudowane
+import math
+import heapq
+import threading
+from array import array
+
+# Moduły aplikacji
+from geocode_cache import get_cache, normalize_key
+from gazetteer import get_gazetteer
+
+# === KONFIGURACJA ===
+CELL_SIZE = 0.01  # Rozmiar komórki siatki w stopniach (~1,1 km szerokości geograficznej)
+CELL_FACTOR = 4  # Ile razy większy bok ma komórka kolejnego, grubszego poziomu siatki
+COARSE_LEVELS = 6  # Liczba grubszych poziomów nad siatką (od 0,04° do ~41° przy domyślnym CELL_SIZE)
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+
+# === FUNKCJE ===
+def haversine_m(lat1, lon1, lat2, lon2):
+    """ Odległość po powierzchni Ziemi (w metrach) między dwoma punktami. """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+# === INDEKS ===
+class SpatialIndex:
+    """ Indeks przestrzenny punktów w siatce komórek (kubełki jak w geohash), aktualizowany przyrostowo.
+
+    Nad siatką leżą COARSE_LEVELS coraz większych poziomów (komórka to CELL_FACTOR × CELL_FACTOR komórek
+    poziomu niżej, zapamiętane są tylko niepuste), więc wyszukiwanie najbliższych punktów omija puste obszary.
+    Obsługuje wyszukiwanie k najbliższych punktów oraz punktów w promieniu.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self._lat = array('d')
+        self._lon = array('d')
+        self._addresses = []
+        self._names = []
+        self._positions = {}  # klucz adresu -> pozycja (ten sam adres dodawany jest tylko raz)
+        self._buckets = {}  # (i, j) -> lista pozycji
+        self._children = [{} for _ in range(COARSE_LEVELS)]  # poziom - 1 -> komórka -> niepuste komórki poziomu niżej
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._addresses)
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_size)), int(math.floor(lon / self.cell_size))
+
+    def add(self, key, address, name, lat, lon):
+        """ Dodaje punkt do indeksu; ponowne dodanie tego samego klucza adresu aktualizuje jego dane. """
+        with self._lock:
+            position = self._positions.get(key)
+            if position is not None:
+                self._remove_from_bucket(position)
+                self._lat[position], self._lon[position] = lat, lon
+                self._addresses[position], self._names[position] = address, name
+            else:
+                position = len(self._addresses)
+                self._positions[key] = position
+                self._addresses.append(address)
+                self._names.append(name)
+                self._lat.append(lat)
+                self._lon.append(lon)
+            cell = self._cell(lat, lon)
+            self._buckets.setdefault(cell, []).append(position)
+            for children in self._children:
+                parent = (cell[0] // CELL_FACTOR, cell[1] // CELL_FACTOR)
+                children.setdefault(parent, set()).add(cell)
+                cell = parent
+
+    def _remove_from_bucket(self, position):
+        cell = self._cell(self._lat[position], self._lon[position])
+        bucket = self._buckets[cell]
+        bucket.remove(position)
+        if bucket:
+            return
+        del self._buckets[cell]
+        # Pusta komórka znika też z poziomów wyżej (aż do komórki, która ma jeszcze inne dzieci)
+        for children in self._children:
+            parent = (cell[0] // CELL_FACTOR, cell[1] // CELL_FACTOR)
+            children[parent].discard(cell)
+            if children[parent]:
+                return
+            del children[parent]
+            cell = parent
+
+    def _result(self, position, distance):
+        return {
+            "Adres": self._addresses[position],
+            "Wyszukany adres": self._names[position],
+            "Latitude": self._lat[position],
+            "Longitude": self._lon[position],
+            "Odległość [m]": round(distance, 1),
+        }
+
+    def _cell_bound(self, lat, lon, sin_lat, cos_lat, level, cell):
+        """ Najmniejsza odległość (w metrach) od punktu do komórki danego poziomu - dolne ograniczenie dla jej punktów. """
+        size = self.cell_size * CELL_FACTOR ** level
+        lat_min, lon_min = cell[0] * size, cell[1] * size
+        # Grube komórki wystają poza ±180° - punkty leżą tylko w części od -180° do 180°
+        lat_max, lon_max = lat_min + size, min(lon_min + size, 180.0)
+        lon_min = max(lon_min, -180.0)
+        if lon_min <= lon <= lon_max:
+            # Ten sam zakres długości - najbliżej jest w linii południka
+            if lat < lat_min:
+                return math.radians(lat_min - lat) * EARTH_RADIUS_M
+            if lat > lat_max:
+                return math.radians(lat - lat_max) * EARTH_RADIUS_M
+            return 0.0
+        # Odległość rośnie z różnicą długości, więc najbliżej jest na bliższym południku krawędzi komórki.
+        # Na nim cos(odległości) = a·sin φ + b·cos φ - maksimum leży na końcu odcinka albo w punkcie krytycznym.
+        dlon = min((lon_min - lon) % 360, (lon - lon_max) % 360)
+        a, b = sin_lat, cos_lat * math.cos(math.radians(dlon))
+        lat_min, lat_max = math.radians(max(lat_min, -90.0)), math.radians(min(lat_max, 90.0))
+        best = max(a * math.sin(lat_min) + b * math.cos(lat_min), a * math.sin(lat_max) + b * math.cos(lat_max))
+        critical = math.atan2(a, b)
+        if lat_min < critical < lat_max:
+            best = math.hypot(a, b)
+        return math.acos(max(-1.0, min(1.0, best))) * EARTH_RADIUS_M
+
+    def nearest(self, lat, lon, k=5):
+        """ Zwraca k najbliższych znanych adresów (od najbliższego) wraz z odległością w metrach.
+
+        Przeszukiwanie od najbliższej komórki (best-first): komórki i punkty trafiają do kopca według
+        dolnego ograniczenia odległości, więc zdjęty z kopca punkt jest zawsze najbliższym z pozostałych.
+        """
+        with self._lock:
+            sin_lat, cos_lat = math.sin(math.radians(lat)), math.cos(math.radians(lat))
+            top = len(self._children)
+            heap = [(self._cell_bound(lat, lon, sin_lat, cos_lat, top, cell), top, cell) for cell in self._children[-1]]
+            heapq.heapify(heap)
+            found = []
+            while heap and len(found) < k:
+                distance, level, item = heapq.heappop(heap)
+                if level < 0:
+                    found.append((distance, item))
+                elif level == 0:
+                    for position in self._buckets[item]:
+                        heapq.heappush(heap, (haversine_m(lat, lon, self._lat[position], self._lon[position]), -1, position))
+                else:
+                    for child in self._children[level - 1][item]:
+                        heapq.heappush(heap, (self._cell_bound(lat, lon, sin_lat, cos_lat, level - 1, child), level - 1, child))
+            return [self._result(position, distance) for distance, position in found]
+
+    def _column_spans(self, lon, dlon):
+        """ Zakresy kolumn siatki obejmujące długości lon ± dlon - zakres przechodzący przez ±180° dzielony jest na dwa. """
+        west, east = lon - dlon, lon + dlon
+        if dlon >= 180:
+            spans = [(-180.0, 180.0)]
+        elif west < -180:
+            spans = [(-180.0, east), (west + 360, 180.0)]
+        elif east > 180:
+            spans = [(west, 180.0), (-180.0, east - 360)]
+        else:
+            spans = [(west, east)]
+        return [(self._cell(0.0, west)[1], self._cell(0.0, east)[1]) for west, east in spans]
+
+    def within_radius(self, lat, lon, radius_m):
+        """ Zwraca znane adresy w promieniu radius_m metrów (od najbliższego). """
+        with self._lock:
+            dlat = radius_m / METERS_PER_DEGREE
+            dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6))
+            min_i, max_i = self._cell(lat - dlat, 0.0)[0], self._cell(lat + dlat, 0.0)[0]
+            spans = self._column_spans(lon, dlon)
+            # Przy bardzo dużym promieniu taniej przejrzeć niepuste kubełki niż wszystkie komórki prostokąta
+            if (max_i - min_i + 1) * sum(max_j - min_j + 1 for min_j, max_j in spans) > len(self._buckets):
+                cells = [cell for cell in self._buckets
+                         if min_i <= cell[0] <= max_i and any(min_j <= cell[1] <= max_j for min_j, max_j in spans)]
+            else:
+                cells = [(i, j) for i in range(min_i, max_i + 1) for min_j, max_j in spans for j in range(min_j, max_j + 1)]
+
+            found = []
+            for cell in cells:
+                for position in self._buckets.get(cell, ()):
+                    distance = haversine_m(lat, lon, self._lat[position], self._lon[position])
+                    if distance <= radius_m:
+                        found.append((distance, position))
+            return [self._result(position, distance) for distance, position in sorted(found)]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_spatial_index():
+    """ Zwraca współdzielony indeks wszystkich punktów znanych aplikacji (zbudowany z cache i spisu adresów). """
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = SpatialIndex()
+            for key, address, name, lat, lon in get_cache().iter_points():
+                index.add(key, address, name, lat, lon)
+            # Adresy ze spisu trafiają do indeksu wszystkie od razu - trafienia w spis nie są dopisywane osobno
+            gazetteer = get_gazetteer()
+            if gazetteer is not None:
+                for name, lat, lon in gazetteer.iter_points():
+                    index.add(normalize_key(name), name, name, lat, lon)
+            _index = index
+        return _index
+
+def index_point(address, name, lat, lon):
+    """ Dopisuje nowo znaleziony punkt do indeksu (jeśli indeks został już zbudowany); w kolumnie "Adres" zostaje adres z wejścia. """
+    if _index is not None:
+        _index.add(normalize_key(address), address.strip(), name, lat, lon)
@@ -0,0 +1,25 @@
+# Moduły aplikacji
+from address_normalizer import normalize_address, address_key, deduplicate_addresses
+
+
+def test_prefix_words_inside_street_names_are_kept():
+    assert normalize_address("ul. Placowa 3, Kraków") == "ul. Placowa 3, Kraków"
+    assert normalize_address("Osiedlowa 5") == "Osiedlowa 5"
+    assert normalize_address("ul. Alejowa 7") == "ul. Alejowa 7"
+
+def test_only_one_prefix_per_part():
+    assert normalize_address("ul Plac Bema 2") == "ul. Plac Bema 2"
+
+def test_prefix_variants_are_canonical():
+    assert normalize_address("ulica  Kwiatowa 1 ,Warszawa") == "ul. Kwiatowa 1, Warszawa"
+    assert normalize_address("Aleje Jerozolimskie 1") == "al. Jerozolimskie 1"
+    assert normalize_address("Plac Bema 2") == "pl. Bema 2"
+    assert normalize_address("ul. Kwiatowa 1, 00 - 950 Warszawa") == "ul. Kwiatowa 1, 00-950 Warszawa"
+
+def test_key_ignores_case_and_diacritics():
+    assert address_key("ULICA Łódzka 1, Łódź") == address_key("ul. lodzka 1, Lodz")
+
+def test_deduplicate_sends_first_original_spelling():
+    unique, row_to_unique = deduplicate_addresses(["ulica Placowa 3", "ul. placowa 3 ", "Plac Bema 2"])
+    assert unique == ["ulica Placowa 3", "Plac Bema 2"]
+    assert row_to_unique == [0, 0, 1]
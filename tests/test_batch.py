@@ -0,0 +1,42 @@
+# Importy wbudowane
+import time
+
+# Moduły aplikacji
+from batch import iter_batch, get_rate_limiter, set_rate_limiter, RateLimiter
+
+
+def limited_lookup(item):
+    """ Wyszukiwanie-atrapa: czeka na limiter procesu i zwraca moment wysłania "zapytania". """
+    get_rate_limiter().wait()
+    return time.monotonic()
+
+def request_times(backend, workers=4, items=8, rate=20):
+    previous = get_rate_limiter()
+    set_rate_limiter(RateLimiter(rate))
+    try:
+        return sorted(result for _, result in iter_batch(range(items), limited_lookup, workers=workers, backend=backend))
+    finally:
+        set_rate_limiter(previous)
+
+def test_thread_backend_keeps_global_rate():
+    times = request_times("thread")
+    assert min(later - earlier for earlier, later in zip(times, times[1:])) >= 0.045
+
+def test_process_backend_shares_one_limiter():
+    times = request_times("process")
+    assert min(later - earlier for earlier, later in zip(times, times[1:])) >= 0.045
+
+def measured_lookup(item):
+    """ Wyszukiwanie-atrapa zapisujące pomiary w METRICS procesu, w którym działa. """
+    from metrics import METRICS
+    METRICS.observe("lookup_total", 0.2)
+    METRICS.count("cache_hit")
+    return item
+
+def test_process_backend_returns_metrics_to_parent():
+    from metrics import METRICS
+    start = METRICS.snapshot()
+    assert sorted(result for _, result in iter_batch(range(6), measured_lookup, workers=3, backend="process")) == list(range(6))
+    summary = METRICS.summary_since(start)
+    assert summary["counters"] == {"cache_hit": 6}
+    assert summary["stages"]["lookup_total"]["count"] == 6
@@ -0,0 +1,58 @@
+# Importy wbudowane
+import io
+import csv
+
+# Importy zewnętrzne
+import pytest
+
+# Moduły aplikacji
+from distances import (read_sites, iter_distance_blocks, assign_to_sites, write_distance_matrix, SITE_COLUMN,
+                       DISTANCE_COLUMN)
+from result_store import ResultStore
+from spatial_index import haversine_m, METERS_PER_DEGREE
+
+
+def test_blank_site_name_falls_back_to_coordinates():
+    source = io.BytesIO("Nazwa;Lat;Lon\n;52.5;21.0\nMagazyn;50.0;19.9\n".encode("utf-8"))
+    (names, site_lat, site_lon), skipped = read_sites(source, "Nazwa", "Lat", "Lon", kind="csv")
+    assert names == ["52.5, 21.0", "Magazyn"]
+    assert list(site_lat) == [52.5, 50.0] and skipped == 0
+
+# Punkty na równiku i południku zerowym - 1° łuku to dokładnie π·R/180 metrów
+POINTS = [("A", 0.0, 0.0), ("B", 1.0, 0.0), ("C", 0.0, 1.0), ("D", 0.0, -179.5)]
+
+
+def test_distance_blocks_match_haversine_across_block_boundaries():
+    pytest.importorskip("numpy")
+    lat, lon = [point[1] for point in POINTS], [point[2] for point in POINTS]
+    rows = {}
+    for start, block in iter_distance_blocks(lat, lon, block_elements=len(POINTS)):  # Jeden wiersz na blok
+        for offset, row in enumerate(block.tolist()):
+            rows[start + offset] = row
+    assert sorted(rows) == [0, 1, 2, 3]
+    for i, (_, lat1, lon1) in enumerate(POINTS):
+        for j, (_, lat2, lon2) in enumerate(POINTS):
+            assert rows[i][j] == pytest.approx(haversine_m(lat1, lon1, lat2, lon2), abs=1e-3)
+    assert rows[0][1] == pytest.approx(METERS_PER_DEGREE, abs=1e-3)
+
+def test_assign_to_sites_picks_nearest_site():
+    pytest.importorskip("numpy")
+    results = ResultStore()
+    for name, lat, lon in POINTS:
+        results.append(name, name, lat, lon, "")
+    sites = (["Zachód", "Wschód"], [0.0, 0.0], [-0.5, 179.9])
+    assign_to_sites(results, sites, block_elements=2)
+    records = list(results.records())
+    assert [record[SITE_COLUMN] for record in records] == ["Zachód", "Zachód", "Zachód", "Wschód"]
+    assert records[0][DISTANCE_COLUMN] == pytest.approx(METERS_PER_DEGREE / 2, abs=0.1)
+    assert records[3][DISTANCE_COLUMN] == pytest.approx(0.6 * METERS_PER_DEGREE, abs=0.1)  # Przez południk 180°
+
+def test_distance_matrix_file_has_whole_metres(tmp_path):
+    pytest.importorskip("numpy")
+    path = tmp_path / "macierz.csv"
+    labels = [point[0] for point in POINTS[:3]]
+    write_distance_matrix(labels, [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], str(path), block_elements=4)
+    rows = list(csv.reader(io.StringIO(path.read_text(encoding="utf-8-sig"))))
+    assert rows[0] == ["", "A", "B", "C"]
+    assert rows[1] == ["A", "0", str(round(METERS_PER_DEGREE)), str(round(METERS_PER_DEGREE))]
+    assert [row[0] for row in rows[1:]] == labels
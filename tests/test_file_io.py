@@ -0,0 +1,16 @@
+# Importy wbudowane
+import io
+
+# Moduły aplikacji
+from file_io import iter_table_rows, iter_column
+
+
+def read_column(text, column="Adres"):
+    return list(iter_column(iter_table_rows(io.BytesIO(text.encode("utf-8")), kind="csv"), column))
+
+def test_single_column_keeps_commas_in_addresses():
+    assert read_column("Adres\nul. Kwiatowa 1, Warszawa\n") == [(2, "ul. Kwiatowa 1, Warszawa")]
+
+def test_delimiter_comes_from_header():
+    assert read_column("Id;Adres\n1;ul. Kwiatowa 1, Warszawa\n") == [(2, "ul. Kwiatowa 1, Warszawa")]
+    assert read_column("Adres,Miasto\nul. Kwiatowa 1,Warszawa\n") == [(2, "ul. Kwiatowa 1")]
@@ -0,0 +1,31 @@
+# Moduły aplikacji
+import gazetteer
+import spatial_index
+from gazetteer import Gazetteer
+
+
+class EmptyCache:
+    def iter_points(self):
+        return []
+
+
+def write_gazetteer(tmp_path):
+    path = tmp_path / "spis.csv"
+    path.write_text("street,housenumber,city,postcode,lat,lon\n"
+                    "Piękna,1,Warszawa,00-001,52.2200,21.0100\n"
+                    "Długa,5,Kraków,,50.0700,19.9400\n", encoding="utf-8")
+    return str(path)
+
+def test_lookup_ignores_prefix_postcode_and_flat_number(tmp_path):
+    spis = Gazetteer.load(write_gazetteer(tmp_path))
+    assert spis.lookup("ul. Piękna 1/12, 00-001 Warszawa")["Wyszukany adres"] == "Piękna 1, 00-001 Warszawa"
+    assert spis.lookup("ul. Piękna 2, Warszawa") is None
+
+def test_spatial_index_contains_whole_gazetteer(tmp_path, monkeypatch):
+    spis = Gazetteer.load(write_gazetteer(tmp_path))
+    monkeypatch.setattr(gazetteer, "_gazetteer", spis)
+    monkeypatch.setattr(gazetteer, "_gazetteer_loaded", True)
+    monkeypatch.setattr(spatial_index, "get_cache", EmptyCache)
+    monkeypatch.setattr(spatial_index, "_index", None)
+    nearest = spatial_index.get_spatial_index().nearest(50.07, 19.94, k=1)
+    assert nearest[0]["Wyszukany adres"] == "Długa 5, Kraków"
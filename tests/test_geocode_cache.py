@@ -0,0 +1,42 @@
+# Importy wbudowane
+import time
+
+# Moduły aplikacji
+from geocode_cache import GeocodeCache
+
+LINK = "https://www.google.com/maps/place/x/@52.1,21.0,17z"
+
+
+def make_cache(tmp_path, **options):
+    return GeocodeCache(str(tmp_path / "cache.sqlite3"), **options)
+
+def test_lookup_uses_normalized_key(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("ulica Łódzka 1, Łódź", LINK, "Łódzka 1, 90-001 Łódź", 52.1, 21.0)
+    assert cache.get("ul. lodzka 1, Lodz")["search_name"] == "Łódzka 1, 90-001 Łódź"
+    assert cache.get("ul. Łódzka 2, Łódź") is None
+    assert [row[1] for row in cache.iter_points()] == ["ulica Łódzka 1, Łódź"]  # Adres w pisowni z wejścia
+
+def test_expired_entries_are_not_returned_and_purged_on_start(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05)
+    cache.put("ul. Polna 1", LINK, "Polna 1", 52.1, 21.0)
+    cache.put("ul. Leśna 2", LINK, "Leśna 2", 52.1, 21.0)
+    time.sleep(0.1)
+    assert cache.get("ul. Polna 1") is None
+    cache.close()
+
+    reopened = make_cache(tmp_path, ttl=0.05)
+    assert reopened.stats()["size"] == 0
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = make_cache(tmp_path, max_entries=3)
+    for number in range(3):
+        cache.put(f"ul. Polna {number}", LINK, f"Polna {number}", 52.1, 21.0)
+        time.sleep(0.01)
+    cache.get("ul. Polna 0")  # Ostatnio używany - zostaje
+    cache.put("ul. Polna 1", LINK, "Polna 1", 52.1, 21.0)  # Nadpisanie nie zwiększa liczby wpisów
+    time.sleep(0.01)
+    cache.put("ul. Polna 3", LINK, "Polna 3", 52.1, 21.0)
+    assert cache.stats()["size"] == 3
+    assert cache.get("ul. Polna 2") is None
+    assert all(cache.get(f"ul. Polna {number}") is not None for number in (0, 1, 3))
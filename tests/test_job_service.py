@@ -0,0 +1,90 @@
+# Importy wbudowane
+import time
+import threading
+
+# Importy zewnętrzne
+import pytest
+
+# Moduły aplikacji
+import journal
+from job_service import JobService, DONE, CANCELLED
+
+
+class FakeLookup:
+    """ Wyszukiwanie-atrapa: zapisuje kolejność wywołań, a adresy z blocked czekają na release(). """
+
+    def __init__(self, blocked=()):
+        self.calls = []
+        self.blocked = set(blocked)
+        self._gate = threading.Event()
+        self._lock = threading.Lock()
+
+    def release(self):
+        self._gate.set()
+
+    def __call__(self, address):
+        with self._lock:
+            self.calls.append(address)
+        if address in self.blocked:
+            self._gate.wait(5)
+        return f"https://www.google.com/maps/place/x/@52.{len(address)},21.0,17z", address.upper()
+
+
+@pytest.fixture(autouse=True)
+def journal_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "JOURNAL_DIR", str(tmp_path))
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Przekroczono czas oczekiwania w teście"
+        time.sleep(0.01)
+
+def test_duplicates_are_looked_up_once_and_fanned_out():
+    lookup = FakeLookup(blocked={"ul. Polna 1"})
+    service = JobService(lookup, workers=2)
+    addresses = ["ul. Polna 1", "ul. Leśna 2", "ul. Polna 1"]
+    job = service.submit(addresses)
+    assert service.submit(list(addresses)) is job  # Ta sama lista w trakcie wyszukiwania - to samo zadanie
+    lookup.release()
+    wait_until(lambda: job.is_finished)
+
+    assert job.status == DONE
+    assert sorted(lookup.calls) == ["ul. Leśna 2", "ul. Polna 1"]
+    assert [record["Wyszukany adres"] for record in job.result_store().records()] == ["UL. POLNA 1", "UL. LEŚNA 2", "UL. POLNA 1"]
+
+def test_cancelled_job_resumes_from_journal():
+    lookup = FakeLookup(blocked={"b"})
+    service = JobService(lookup, workers=1)
+    job = service.submit(["a", "b", "c"])
+    wait_until(lambda: "b" in lookup.calls)
+    service.cancel(job.id)
+    lookup.release()
+    wait_until(lambda: job.completed == 2)
+    assert job.status == CANCELLED and lookup.calls == ["a", "b"]
+
+    # Wyszukiwanie trwające w chwili anulowania też trafia do dziennika - wznowienie szuka tylko reszty
+    resumed = service.submit(["a", "b", "c"])
+    assert resumed is not job
+    wait_until(lambda: resumed.is_finished)
+    assert resumed.status == DONE and lookup.calls == ["a", "b", "c"]
+    assert resumed.completed == resumed.total == 3
+
+def test_jobs_share_workers_in_turn():
+    lookup = FakeLookup(blocked={"a1"})
+    service = JobService(lookup, workers=1)
+    first = service.submit(["a1", "a2", "a3"])
+    wait_until(lambda: lookup.calls == ["a1"])
+    second = service.submit(["b1", "b2", "b3"])
+    lookup.release()
+    wait_until(lambda: first.is_finished and second.is_finished)
+    assert lookup.calls.index("b1") < lookup.calls.index("a3")
+    assert lookup.calls.index("a3") < lookup.calls.index("b3")
+
+def test_finished_jobs_expire_after_ttl():
+    service = JobService(FakeLookup(), workers=1, ttl=0.05)
+    job = service.submit(["a"])
+    wait_until(lambda: job.is_finished)
+    assert service.get(job.id) is job
+    time.sleep(0.1)
+    assert service.get(job.id) is None
@@ -0,0 +1,33 @@
+# Importy wbudowane
+import threading
+
+# Moduły aplikacji
+from metrics import Metrics
+
+
+def test_recording_to_collects_only_current_thread():
+    metrics, job_metrics = Metrics(), Metrics()
+
+    def other_job():
+        metrics.count("cache_hit")
+        metrics.observe("lookup_total", 1.0)
+
+    with metrics.recording_to(job_metrics):
+        metrics.count("cache_hit")
+        metrics.observe("lookup_total", 0.5)
+        thread = threading.Thread(target=other_job)
+        thread.start()
+        thread.join()
+    metrics.count("cache_hit")
+
+    assert job_metrics.summary() == {"stages": {"lookup_total": {"count": 1, "mean_s": 0.5}}, "counters": {"cache_hit": 1}}
+    assert metrics.summary()["counters"] == {"cache_hit": 3}
+
+def test_merge_adds_exported_metrics():
+    metrics, child = Metrics(), Metrics()
+    metrics.observe("lookup_total", 0.5)
+    child.observe("lookup_total", 1.5)
+    child.count("cache_hit", 2)
+    metrics.merge(child.export())
+    assert metrics.summary() == {"stages": {"lookup_total": {"count": 2, "mean_s": 1.0}}, "counters": {"cache_hit": 2}}
+    assert 'geo_stage_seconds_count{stage="lookup_total"} 2' in metrics.to_prometheus()
@@ -0,0 +1,61 @@
+# Importy wbudowane
+from contextlib import contextmanager
+
+# Importy zewnętrzne
+import pytest
+
+pytest.importorskip("selenium")
+
+# Moduły aplikacji
+import page_wait
+from page_wait import wait_for_result, FOUND, NO_ADDRESS, TIMEOUT
+
+PREVIOUS_URL = "https://www.google.com/maps/@52.2297,21.0122,12z"
+
+
+class FakeDriver:
+    """ Karta bez panelu z adresem - adres URL ustawiony na stałe po wyszukiwaniu. """
+
+    def __init__(self, url, address=None):
+        self.current_url = url
+        self.address = address
+
+    def find_elements(self, by, value):
+        if value == page_wait.ADDRESS_SELECTOR and self.address:
+            return [FakeElement(self.address)]
+        return []
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.id = "new"
+        self.text = text
+
+
+class FakeTab:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @contextmanager
+    def active(self):
+        yield self.driver
+
+
+@pytest.fixture(autouse=True)
+def short_grace(monkeypatch):
+    monkeypatch.setattr(page_wait, "ADDRESS_GRACE", 0.2)
+
+def settle(url, address=None):
+    return wait_for_result(FakeTab(FakeDriver(url, address)), PREVIOUS_URL, timeout=1.0).status
+
+def test_place_link_without_address():
+    assert settle("https://www.google.com/maps/place/Rynek/@50.06,19.94,17z/data=!3d50.0617!4d19.9373") == NO_ADDRESS
+
+def test_result_list_with_new_viewport_is_not_a_timeout():
+    assert settle("https://www.google.com/maps/search/Rynek/@50.06,19.94,12z") == NO_ADDRESS
+
+def test_search_link_with_previous_viewport_keeps_waiting():
+    assert settle("https://www.google.com/maps/search/Rynek/@52.2297,21.0122,12z") == TIMEOUT
+
+def test_address_panel_ends_wait_at_once():
+    assert settle("https://www.google.com/maps/search/Rynek/@52.2297,21.0122,12z", "Rynek 1, Kraków") == FOUND
@@ -0,0 +1,65 @@
+# Importy wbudowane
+import time
+
+# Importy zewnętrzne
+import pytest
+
+# Moduły aplikacji
+from resilience import (LookupFailure, CircuitBreaker, retry, TIMEOUT, BLOCKED, NO_RESULT, DRIVER_CRASH,
+                        CLOSED, OPEN, HALF_OPEN)
+
+
+def failing(*kinds, result="ok"):
+    """ Zwraca funkcję zgłaszającą kolejno błędy kinds, a potem zwracającą result; calls liczy wywołania. """
+    kinds = list(kinds)
+
+    def call():
+        call.calls += 1
+        if kinds:
+            raise LookupFailure(kinds.pop(0))
+        return result
+    call.calls = 0
+    return call
+
+def test_transient_failures_are_retried():
+    call = failing(DRIVER_CRASH, BLOCKED)
+    assert retry(call, attempts=3, base_delay=0) == "ok"
+    assert call.calls == 3
+
+def test_final_failure_is_not_retried():
+    call = failing(NO_RESULT)
+    with pytest.raises(LookupFailure) as error:
+        retry(call, attempts=3, base_delay=0)
+    assert error.value.kind == NO_RESULT and call.calls == 1
+
+def test_timeouts_are_retried_at_most_once():
+    call = failing(TIMEOUT, TIMEOUT, TIMEOUT)
+    with pytest.raises(LookupFailure) as error:
+        retry(call, attempts=5, base_delay=0, timeout_retries=1)
+    assert error.value.kind == TIMEOUT and call.calls == 2
+
+def test_only_blocks_and_crashes_recycle_the_browser():
+    assert LookupFailure(BLOCKED).recycles_browser and LookupFailure(DRIVER_CRASH).recycles_browser
+    assert not LookupFailure(TIMEOUT).recycles_browser
+
+def test_breaker_opens_after_blocks_and_probes_after_cooldown():
+    breaker = CircuitBreaker(window=4, min_calls=4, threshold=0.5, cooldown=0.05, max_cooldown=1.0)
+    for blocked in (False, True, False, False):
+        breaker.before_call()
+        breaker.record(blocked)
+    assert breaker.state == CLOSED
+    breaker.before_call()
+    breaker.record(True)
+    assert breaker.state == OPEN and breaker.paused_for() > 0
+
+    started = time.monotonic()
+    breaker.before_call()  # Czeka do końca przerwy i przepuszcza wyszukiwanie próbne
+    assert time.monotonic() - started >= 0.04
+    assert breaker.state == HALF_OPEN
+
+    # Blokada próby otwiera wyłącznik z dwukrotnie dłuższą przerwą, udana próba go zamyka
+    breaker.record(True)
+    assert breaker.state == OPEN and breaker.cooldown == pytest.approx(0.1)
+    breaker.before_call()
+    breaker.record(False)
+    assert breaker.state == CLOSED and breaker.cooldown == pytest.approx(0.05)
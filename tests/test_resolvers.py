@@ -0,0 +1,41 @@
+# Importy zewnętrzne
+import pytest
+
+pytest.importorskip("requests")
+
+# Moduły aplikacji
+from benchmarks.fake_maps_server import FakeMaps, start_server
+from geocoder import extract_coordinates
+from resilience import LookupFailure, BLOCKED
+from resolvers import HttpResolver
+
+
+@pytest.fixture
+def fake_maps():
+    fake = FakeMaps(delay=0, jitter=0)
+    server, base_url = start_server(fake)
+    yield fake, base_url
+    server.shutdown()
+    server.server_close()
+
+def test_redirect_to_place_link_is_resolved(fake_maps):
+    fake, base_url = fake_maps
+    place = fake.place("Piękna 1, Warszawa")
+    map_link, search_name = HttpResolver(base_url=base_url).resolve("Piękna 1, Warszawa")
+    assert search_name == place["name"]
+    assert extract_coordinates(map_link) == (place["lat"], place["lon"])
+
+def test_server_error_falls_back_to_next_backend(fake_maps):
+    fake, base_url = fake_maps
+    fake.failure_rate = 1.0
+    assert HttpResolver(base_url=base_url).resolve("Piękna 1, Warszawa") is None
+
+def test_rate_limit_answer_is_reported_as_block(fake_maps):
+    fake, base_url = fake_maps
+    fake.blocked = True
+    with pytest.raises(LookupFailure) as error:
+        HttpResolver(base_url=base_url).resolve("Piękna 1, Warszawa")
+    assert error.value.kind == BLOCKED
+
+def test_page_without_redirect_is_not_resolved():
+    assert HttpResolver(base_url="http://127.0.0.1").parse("<html></html>", "http://127.0.0.1/maps/search/x/@52.1,21.0,12z") is None
@@ -0,0 +1,48 @@
+# Importy wbudowane
+import random
+
+# Moduły aplikacji
+from spatial_index import SpatialIndex, haversine_m
+
+
+def random_points(count, seed):
+    """ Punkty losowe na całej kuli i skupione przy południku 180° (komórki siatki przechodzą tam przez ±180°). """
+    rng = random.Random(seed)
+    points = []
+    for number in range(count):
+        if number % 2:
+            lat, lon = rng.uniform(-80, 80), rng.choice((-1, 1)) * rng.uniform(150, 180)
+        else:
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        points.append((f"punkt {number}", lat, lon))
+    return points
+
+def build_index(points):
+    index = SpatialIndex()
+    for name, lat, lon in points:
+        index.add(name, name, name, lat, lon)
+    return index
+
+def test_nearest_matches_brute_force():
+    points = random_points(3000, seed=1)
+    index = build_index(points)
+    rng = random.Random(2)
+    for _ in range(200):
+        lat, lon = rng.uniform(-90, 90), rng.choice((rng.uniform(-180, 180), rng.choice((-1, 1)) * rng.uniform(160, 180)))
+        expected = sorted(haversine_m(lat, lon, point_lat, point_lon) for _, point_lat, point_lon in points)[:3]
+        found = [result["Odległość [m]"] for result in index.nearest(lat, lon, k=3)]
+        assert found == [round(distance, 1) for distance in expected]
+
+def test_within_radius_crosses_antimeridian():
+    points = random_points(3000, seed=3)
+    index = build_index(points)
+    rng = random.Random(4)
+    for _ in range(100):
+        lat, lon = rng.uniform(-70, 70), rng.choice((-1, 1)) * rng.uniform(170, 180)
+        radius = rng.uniform(50_000, 1_500_000)
+        expected = sorted(name for name, point_lat, point_lon in points if haversine_m(lat, lon, point_lat, point_lon) <= radius)
+        assert sorted(result["Adres"] for result in index.within_radius(lat, lon, radius)) == expected
+
+def test_within_radius_near_pole_covers_all_longitudes():
+    index = build_index([("a", 89.5, 0.0), ("b", 89.5, 179.0), ("c", 89.5, -90.0)])
+    assert sorted(result["Adres"] for result in index.within_radius(89.9, 45.0, 200_000)) == ["a", "b", "c"]